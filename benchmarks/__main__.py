@@ -0,0 +1,204 @@
+import argparse
+import atexit
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(ROOT, "benchmarks", "results")
+THRESHOLD = 0.2
+
+sys.path.insert(0, ROOT)
+os.environ["STATEPROJECT_DATA_DIR"] = tempfile.mkdtemp(prefix="stateproject-bench-")
+atexit.register(shutil.rmtree, os.environ["STATEPROJECT_DATA_DIR"], True)
+os.environ["STATEPROJECT_OFFLINE"] = "1"
+
+
+def measure(func, budget: float = 0.5, repeat: int = 5):
+    """
+    Times a function, running it enough times per sample for the timer to be accurate
+
+    Args:
+        func (callable): The function to be timed
+        budget (float): Roughly how many seconds to spend on all samples
+        repeat (int): The amount of samples
+    Returns:
+        dict: The median and the fastest time of one call in milliseconds, and the calls per sample
+    """
+    func()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget / repeat or loops >= 1_000_000:
+            break
+        loops *= 2
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    samples.sort()
+    return {
+        "median_ms": samples[len(samples) // 2] * 1000,
+        "min_ms": samples[0] * 1000,
+        "loops": loops,
+    }
+
+
+def commit():
+    """
+    Names the current commit, marking uncommitted changes
+
+    Returns:
+        str: The short hash of HEAD, followed by "-dirty" if the tree has changes, or "unknown" outside of git
+    """
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{head}-dirty" if dirty else head
+
+
+def baseline(against: str, current: str):
+    """
+    Finds the results to compare against
+
+    Args:
+        against (str): A commit name or path to compare against, the newest other results file if empty
+        current (str): The path of the results of this run
+    Returns:
+        dict: The stored results, or None if there are none
+    """
+    if against:
+        path = (
+            against
+            if os.path.exists(against)
+            else os.path.join(RESULTS, f"{against}.json")
+        )
+    else:
+        paths = [
+            i
+            for i in glob.glob(os.path.join(RESULTS, "*.json"))
+            if os.path.abspath(i) != os.path.abspath(current)
+        ]
+        if not paths:
+            return None
+        path = max(paths, key=os.path.getmtime)
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the scoring and rendering hot paths offline against Census fixtures"
+    )
+    parser.add_argument(
+        "-k",
+        "--filter",
+        default="",
+        help="Only run benchmarks whose name contains this",
+    )
+    parser.add_argument(
+        "--against",
+        default="",
+        help="Commit or results file to compare against, the newest other results by default",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="Slowdown that counts as a regression, 0.2 means 20%%",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=0.5,
+        help="Seconds to spend timing each benchmark",
+    )
+    parser.add_argument(
+        "--no-save", action="store_true", help="Do not store the results"
+    )
+    args = parser.parse_args()
+
+    from streamlit import logger
+
+    logger.set_log_level("error")
+    from benchmarks.cases import CASES
+
+    name = commit()
+    path = os.path.join(RESULTS, f"{name}.json")
+    results = {}
+    for case, (setup, geographies, counts) in CASES.items():
+        if args.filter not in case:
+            continue
+        for geography in geographies:
+            for count in counts:
+                params = [str(i) for i in (geography, count) if i not in ["-", None]]
+                key = f"{case}[{'-'.join(params)}]"
+                results[key] = measure(setup(geography, count), args.budget)
+                print(f"{key:55} {results[key]['median_ms']:12.4f} ms", flush=True)
+
+    previous = baseline(args.against, path)
+    regressions = []
+    if previous:
+        print(f"\nCompared against {previous['commit']}")
+        for key, result in results.items():
+            if key not in previous["results"]:
+                continue
+            before = previous["results"][key]["median_ms"]
+            change = result["median_ms"] / before - 1
+            flag = "REGRESSION" if change > args.threshold else ""
+            if flag:
+                regressions.append(key)
+            print(
+                f"{key:55} {before:12.4f} -> {result['median_ms']:12.4f} ms {change:+8.1%} {flag}"
+            )
+
+    if not args.no_save:
+        os.makedirs(RESULTS, exist_ok=True)
+        if os.path.exists(path):
+            with open(path) as f:
+                results = json.load(f)["results"] | results
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "commit": name,
+                    "date": time.time(),
+                    "python": sys.version,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nSaved to {path}")
+    if regressions:
+        print(
+            f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
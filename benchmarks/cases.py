@@ -0,0 +1,207 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+import catalog
+import census
+import normalize
+import scoring
+import sensitivity
+import sharecode
+from benchmarks import fixtures
+
+COUNTS = (7, 50, 500)
+GEOGRAPHIES = ("state", "county")
+CASES = {}
+
+
+def case(name: str, geographies=GEOGRAPHIES, counts=COUNTS):
+    """
+    Registers a benchmark. The decorated function gets a geography and an indicator count, does its setup and returns the function to be timed
+
+    Args:
+        name (str): The name of the benchmark, usually the function it times
+        geographies (tuple): The geographies to run it for
+        counts (tuple): The indicator counts to run it for
+    """
+
+    def wrap(setup):
+        CASES[name] = (setup, geographies, counts)
+        return setup
+
+    return wrap
+
+
+def matrix(geography: str, count: int):
+    """
+    Builds a matrix of stats from the fixtures
+
+    Args:
+        geography (str): "state" or "county"
+        count (int): The amount of indicators
+    Returns:
+        DataFrame: A Pandas DataFrame with a column of names and one column of stats per code, one row per place
+    """
+    columns = {}
+    for data in fixtures.responses(geography, count):
+        tail = 1 if geography == "state" else 2
+        columns["NAME"] = [i[0] for i in data[1:]]
+        for position, code in enumerate(data[0][1:-tail], 1):
+            columns[code] = [float(i[position]) for i in data[1:]]
+    return pd.DataFrame(columns)
+
+
+def populated(geography: str, count: int):
+    """
+    Builds an engine holding every indicator of matrix, a third of them inverse
+
+    Args:
+        geography (str): "state" or "county"
+        count (int): The amount of indicators
+    Returns:
+        Engine: An Engine object with a normalized column for every code of matrix
+    """
+    data = matrix(geography, count)
+    engine = scoring.Engine(data["NAME"])
+    engine.add(data, {code: i % 3 == 0 for i, code in enumerate(data.columns)})
+    return engine
+
+
+@case("minmax_scale")
+def minmax_scale(geography, count):
+    stats = matrix(geography, count).drop(columns="NAME").to_numpy()
+    return lambda: scoring.minmax_scale(stats, (0, 1))
+
+
+@case("census.parse")
+def parse(geography, count):
+    responses = fixtures.responses(geography, count)
+
+    def run():
+        columns = {}
+        for data in responses:
+            census.parse(data, columns)
+
+    return run
+
+
+@case("Engine.add")
+def engine_add(geography, count):
+    data = matrix(geography, count)
+    inverts = {code: i % 3 == 0 for i, code in enumerate(data.columns)}
+
+    def run():
+        scoring.Engine(data["NAME"]).add(data, inverts)
+
+    return run
+
+
+@case("Engine.normalized")
+def engine_normalized(geography, count):
+    engine = populated(geography, count)
+    methods = [method for method in normalize.METHODS if method != engine.method]
+
+    def run():
+        for method in methods:
+            engine.normalized(method)
+
+    return run
+
+
+@case("MultiState.process")
+def multi_process(geography, count):
+    engine = populated(geography, count)
+    values = {code: i % 20 + 1 for i, code in enumerate(engine.columns)}
+    return lambda: engine.score(values)
+
+
+@case("Cube.score/ranks")
+def cube_score(geography, count):
+    engine = populated(geography, count)
+    codes = list(engine.columns)
+    years = census.years()
+    frame = np.column_stack([engine.columns[code] for code in codes])
+    cube = scoring.Cube(
+        pd.Series(engine.names, index=engine.ansi),
+        years,
+        codes,
+        np.stack([frame] * len(years)),
+    )
+    values = {code: i % 20 + 1 for i, code in enumerate(codes)}
+    return lambda: scoring.ranks(cube.score(values))
+
+
+@case("sensitivity.histogram", counts=(7, 50))
+def sensitivity_histogram(geography, count):
+    engine = populated(geography, count)
+    columns = np.column_stack(list(engine.columns.values()))
+    seed = np.random.SeedSequence(count)
+    return lambda: sensitivity.histogram(columns, 100, 1000, seed)
+
+
+@case("listencode/listdecode", geographies=("-",))
+def legacy_codes(geography, count):
+    weights = list(np.random.default_rng(count).integers(0, 1296, count))
+    return lambda: sharecode.listdecode(sharecode.listencode(weights))
+
+
+@case("encode_weights/decode_weights", geographies=("-",))
+def versioned_codes(geography, count):
+    weights = dict(enumerate(np.random.default_rng(count).integers(0, 1000, count)))
+    return lambda: sharecode.decode_weights(sharecode.encode_weights(weights))
+
+
+@case("decode_many", geographies=("-",))
+def bulk_codes(geography, count):
+    matrix = np.random.default_rng(count).integers(0, 30, (10000, count))
+    ids = list(range(count))
+    codes = sharecode.encode_many(matrix, ids)
+    return lambda: sharecode.decode_many(codes, ids)
+
+
+def places(geography):
+    """
+    Stores every indicator in the manifest for a geography and, for counties, the county boundaries, so that the map can be built offline
+
+    Args:
+        geography (str): "state" or "county"
+    """
+    import geo
+
+    columns = {}
+    census.parse(fixtures.response(geography, list(catalog.load())), columns)
+    census.store.put(
+        {census.key(code, geography): value for code, value in columns.items()}
+    )
+    if geography == "county" and not os.path.exists(geo.PATH):
+        os.makedirs(os.path.dirname(geo.PATH), exist_ok=True)
+        with open(geo.PATH, "w") as f:
+            json.dump(geo.simplify(fixtures.counties()), f)
+
+
+@case("base_graph", counts=(None,))
+def base_graph(geography, count):
+    import main
+
+    places(geography)
+    return lambda: main.base_graph.__wrapped__("reds", geography)
+
+
+@case("graph", counts=(None,))
+def graph(geography, count):
+    import main
+
+    places(geography)
+    base = main.base_graph.__wrapped__("reds", geography)
+    engine = main.MultiState.engine.__wrapped__(geography)
+    df = pd.DataFrame(
+        {
+            "NAME": engine.names,
+            "score": np.linspace(0, 100, len(engine.names)),
+            "ansi": engine.ansi,
+        }
+    )
+    return lambda: pio.to_json(main.figure(base, df), validate=False)
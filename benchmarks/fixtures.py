@@ -0,0 +1,235 @@
+import functools
+import json
+import os
+import zlib
+
+import numpy as np
+
+DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+STATES = {
+    "01": "Alabama",
+    "02": "Alaska",
+    "04": "Arizona",
+    "05": "Arkansas",
+    "06": "California",
+    "08": "Colorado",
+    "09": "Connecticut",
+    "10": "Delaware",
+    "11": "District of Columbia",
+    "12": "Florida",
+    "13": "Georgia",
+    "15": "Hawaii",
+    "16": "Idaho",
+    "17": "Illinois",
+    "18": "Indiana",
+    "19": "Iowa",
+    "20": "Kansas",
+    "21": "Kentucky",
+    "22": "Louisiana",
+    "23": "Maine",
+    "24": "Maryland",
+    "25": "Massachusetts",
+    "26": "Michigan",
+    "27": "Minnesota",
+    "28": "Mississippi",
+    "29": "Missouri",
+    "30": "Montana",
+    "31": "Nebraska",
+    "32": "Nevada",
+    "33": "New Hampshire",
+    "34": "New Jersey",
+    "35": "New Mexico",
+    "36": "New York",
+    "37": "North Carolina",
+    "38": "North Dakota",
+    "39": "Ohio",
+    "40": "Oklahoma",
+    "41": "Oregon",
+    "42": "Pennsylvania",
+    "44": "Rhode Island",
+    "45": "South Carolina",
+    "46": "South Dakota",
+    "47": "Tennessee",
+    "48": "Texas",
+    "49": "Utah",
+    "50": "Vermont",
+    "51": "Virginia",
+    "53": "Washington",
+    "54": "West Virginia",
+    "55": "Wisconsin",
+    "56": "Wyoming",
+    "72": "Puerto Rico",
+}
+COUNTIES = 3221
+YEAR = 2023
+GEOGRAPHIES = {"state": len(STATES), "county": COUNTIES}
+
+
+def codes(count: int):
+    """
+    Makes up stable codes for synthetic indicators
+
+    Args:
+        count (int): The amount of codes
+    Returns:
+        list: The codes
+    """
+    return [f"S9{i // 100:03d}_C01_{i % 100:03d}E" for i in range(count)]
+
+
+def recorded(geography: str):
+    """
+    Reads the responses recorded by record.py for a geography, if there are any
+
+    Args:
+        geography (str): "state" or "county"
+    Returns:
+        list: The recorded responses, empty if nothing was recorded
+    """
+    path = os.path.join(DIR, f"{geography}.json")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def column(code: str, rows: int):
+    """
+    Makes up a column of stats that looks like a percentage or an income
+
+    Args:
+        code (str): The code of the column, which seeds it
+        rows (int): The amount of rows
+    Returns:
+        ndarray: The stats
+    """
+    random = np.random.default_rng(zlib.crc32(code.encode()))
+    if random.random() < 0.3:
+        return np.round(random.lognormal(11, 0.3, rows))
+    return np.round(random.uniform(2, 60, rows), 1)
+
+
+@functools.cache
+def table(geography: str):
+    """
+    Gathers the places of a geography and the columns recorded by record.py for it, making up the places if nothing was recorded
+
+    Args:
+        geography (str): "state" or "county"
+    Returns:
+        tuple: The rows of each place as its name followed by its ANSI codes, and the recorded columns of strings keyed by code
+    """
+    real = {}
+    rows = None
+    for data in recorded(geography):
+        tail = 1 if geography == "state" else 2
+        for position, code in enumerate(data[0][1:-tail], 1):
+            real[code] = [i[position] for i in data[1:]]
+        rows = [[i[0], *i[-tail:]] for i in data[1:]]
+    if rows is None and geography == "state":
+        rows = [[name, fips] for fips, name in STATES.items()]
+    elif rows is None:
+        fips = list(STATES)
+        rows = []
+        for n in range(COUNTIES):
+            state = fips[n % len(fips)]
+            county = f"{n // len(fips) * 2 + 1:03d}"
+            rows.append([f"County {county}, {STATES[state]}", state, county])
+    return rows, real
+
+
+def drift(values: list, code: str, year: int):
+    """
+    Makes up the stats of another year by letting every place drift a little further from the recorded year the further away the year is
+
+    Args:
+        values (list): The stats of YEAR as strings
+        code (str): The code of the column, which seeds the drift along with the year
+        year (int): The year to make up
+    Returns:
+        list: The stats of year as strings
+    """
+    if year == YEAR:
+        return values
+    random = np.random.default_rng(zlib.crc32(f"{code}:{year}".encode()))
+    stats = np.asarray(values, dtype=float)
+    stats = stats * random.normal(1, 0.02 * abs(year - YEAR), len(stats))
+    return [str(v) for v in np.round(stats, 1)]
+
+
+def response(geography: str, names: list, year: int = None):
+    """
+    Builds the Census API response to a request for names, using recorded columns where there are any and synthetic columns otherwise
+
+    Args:
+        geography (str): "state" or "county"
+        names (list): The requested codes, without NAME
+        year (int): The year of the release, YEAR if left out
+    Returns:
+        list: A header row followed by one row per place, with every value a string like the real API sends
+    """
+    rows, real = table(geography)
+    values = {
+        code: drift(
+            real.get(code) or [str(v) for v in column(code, len(rows))],
+            code,
+            year or YEAR,
+        )
+        for code in names
+    }
+    tail = ["state"] if geography == "state" else ["state", "county"]
+    data = [["NAME", *names, *tail]]
+    for n, row in enumerate(rows):
+        data.append([row[0], *(values[code][n] for code in names), *row[1:]])
+    return data
+
+
+def responses(geography: str, count: int, batch: int = 49):
+    """
+    Builds Census API responses for count indicators, split into batches the way census.fetch requests them. Columns recorded by record.py are used first and synthetic columns fill in the rest
+
+    Args:
+        geography (str): "state" or "county"
+        count (int): The amount of indicators
+        batch (int): The most indicators per response
+    Returns:
+        list: The responses, each a header row followed by one row per place, with every value a string like the real API sends
+    """
+    real = table(geography)[1]
+    names = (list(real) + codes(count))[:count]
+    return [
+        response(geography, names[i : i + batch])
+        for i in range(0, max(count, 1), batch)
+    ]
+
+
+def counties(points: int = 64):
+    """
+    Makes up county boundaries in the shape of the GeoJSON that geo.counties loads, one ring of points around a spot on a grid over the contiguous states per county, with full precision coordinates like the real outlines
+
+    Args:
+        points (int): The amount of points per ring
+    Returns:
+        dict: A GeoJSON feature collection with the five digit FIPS code of each county as its id
+    """
+    rows = table("county")[0]
+    side = int(np.ceil(np.sqrt(len(rows))))
+    angles = np.linspace(0, 2 * np.pi, points)
+    features = []
+    for n, row in enumerate(rows):
+        x = -124 + 57 * (n % side) / side
+        y = 25 + 24 * (n // side) / side
+        ring = np.column_stack(
+            [x + 0.4 * np.cos(angles), y + 0.3 * np.sin(angles)]
+        ).round(6)
+        ring[-1] = ring[0]
+        features.append(
+            {
+                "type": "Feature",
+                "id": "".join(row[1:]),
+                "properties": {"NAME": row[0]},
+                "geometry": {"type": "Polygon", "coordinates": [ring.tolist()]},
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
@@ -0,0 +1,283 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRYPOINT = os.path.join(ROOT, "entrypoint.py")
+TIMEOUT = 120
+
+sys.path.insert(0, ROOT)
+
+
+def script(at, rng: random.Random, edits: int, county: float, years: float):
+    """
+    Walks one simulated user through every page, yielding before each rerun so that sessions can be interleaved. Some users arrive through a shared link, everyone changes weights, overrides settings, reads the documentation and applies a code
+
+    Args:
+        at (AppTest): The session
+        rng (Random): The source of every choice the user makes
+        edits (int): The amount of weight changes before and after the detour through the other pages
+        county (float): The chance that the user switches to scoring counties
+        years (float): The chance that the user switches to showing every year
+    Yields:
+        tuple: The name of the action and a function that makes the rerun
+    """
+    import catalog
+    import core
+
+    def link():
+        if rng.random() < 0.3:
+            at.query_params["code"] = code()
+        return at.run()
+
+    def weight():
+        number = rng.choice(at.sidebar.number_input)
+        return number.set_value(rng.randint(0, int(number.max))).run()
+
+    def code():
+        return core.share({i: rng.randint(0, 14) for i in catalog.load()})
+
+    def apply():
+        at.sidebar.text_input(key="code_input").input(code())
+        return at.sidebar.button[0].click().run()
+
+    def toggle(key: str):
+        return at.toggle(key=key).set_value(not at.toggle(key=key).value).run()
+
+    yield "open", link
+    for _ in range(edits):
+        yield "weight", weight
+    yield "settings", lambda: at.switch_page("settings.py").run()
+    yield "rounding", lambda: toggle("_table_round_toggle")
+    if rng.random() < county:
+        yield "county", lambda: toggle("_county_mode")
+    if rng.random() < years:
+        yield "years", lambda: toggle("_time_mode")
+    if rng.random() < 0.5:
+        yield "cscale", lambda: toggle("_graph_cscale_toggle")
+    yield "documentation", lambda: at.switch_page("documentation.py").run()
+    yield "main", lambda: at.switch_page("main.py").run()
+    yield "code", apply
+    for _ in range(edits):
+        yield "weight", weight
+
+
+def worker(sessions: list, seed: int, edits: int, county: float, years: float):
+    """
+    Runs sessions in this process, all alive at once and advanced one rerun at a time in turn, then measures the memory a fresh session keeps
+
+    Args:
+        sessions (list): The numbers of the sessions to run
+        seed (int): The seed of the whole load test
+        edits (int): The amount of weight changes per visit to the main page
+        county (float): The chance that a session switches to scoring counties
+        years (float): The chance that a session switches to showing every year
+    Returns:
+        dict: Every rerun as its action and seconds, the errors seen, the bytes retained by and peaking in one session and the bytes of its session state
+    """
+    from streamlit.testing.v1 import AppTest
+
+    import profiling
+
+    logging.disable(logging.WARNING)
+    running = [
+        (
+            n,
+            script(
+                AppTest.from_file(ENTRYPOINT, default_timeout=TIMEOUT),
+                random.Random(seed + n),
+                edits,
+                county,
+                years,
+            ),
+        )
+        for n in sessions
+    ]
+    reruns = []
+    errors = []
+    while running:
+        for entry in list(running):
+            n, steps = entry
+            try:
+                action, rerun = next(steps)
+            except StopIteration:
+                running.remove(entry)
+                continue
+            start = time.perf_counter()
+            try:
+                at = rerun()
+            except Exception as e:
+                errors.append(f"session {n} {action}: {e!r}")
+                running.remove(entry)
+                continue
+            reruns.append((action, time.perf_counter() - start))
+            if at.exception:
+                errors.append(f"session {n} {action}: {at.exception[0].message}")
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    at = AppTest.from_file(ENTRYPOINT, default_timeout=TIMEOUT)
+    for _, rerun in script(at, random.Random(seed - 1), edits, county, years):
+        rerun()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    state = sum(row["bytes"] for row in profiling.footprint(at.session_state.to_dict()))
+    return {
+        "reruns": reruns,
+        "errors": errors,
+        "retained": retained - before,
+        "peak": peak - before,
+        "state": state,
+    }
+
+
+def percentiles(times: list):
+    """
+    Summarizes rerun times
+
+    Args:
+        times (list): The seconds of each rerun
+    Returns:
+        dict: The sample count and the mean, p50, p95 and p99 in milliseconds
+    """
+    times = np.asarray(times)
+    p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1000
+    return {
+        "samples": len(times),
+        "mean_ms": times.mean() * 1000,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drives simulated sessions through every page against a local Census stand-in and reports rerun latency, throughput and memory"
+    )
+    parser.add_argument(
+        "-n", "--sessions", type=int, default=20, help="Simulated sessions in total"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        help="Processes running sessions side by side, so reruns in flight at once",
+    )
+    parser.add_argument(
+        "--edits",
+        type=int,
+        default=5,
+        help="Weight changes per visit to the main page",
+    )
+    parser.add_argument(
+        "--county",
+        type=float,
+        default=0.2,
+        help="Share of sessions that switch to scoring counties",
+    )
+    parser.add_argument(
+        "--years",
+        type=float,
+        default=0.2,
+        help="Share of sessions that switch to showing every year",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.1,
+        help="Seconds the Census stand-in delays every response",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Most seconds added to the delay at random",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    from benchmarks.stub import Server
+
+    server = Server(latency=args.latency, jitter=args.jitter).start()
+    data = tempfile.mkdtemp(prefix="stateproject-load-")
+    os.environ["STATEPROJECT_DATA_DIR"] = data
+    os.environ.update(server.urls)
+    os.environ.pop("STATEPROJECT_OFFLINE", None)
+    workers = max(1, min(args.workers, args.sessions))
+    shares = [list(range(i, args.sessions, workers)) for i in range(workers)]
+    try:
+        start = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            results = pool.starmap(
+                worker,
+                [
+                    (share, args.seed, args.edits, args.county, args.years)
+                    for share in shares
+                ],
+            )
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        shutil.rmtree(data, True)
+
+    reruns = [rerun for result in results for rerun in result["reruns"]]
+    errors = [error for result in results for error in result["errors"]]
+    actions = {}
+    for action, seconds in reruns:
+        actions.setdefault(action, []).append(seconds)
+    report = {
+        "sessions": args.sessions,
+        "workers": workers,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "seconds": elapsed,
+        "throughput": len(reruns) / elapsed,
+        "census_requests": server.requests,
+        "reruns": percentiles([seconds for _, seconds in reruns]),
+        "actions": {
+            action: percentiles(times) for action, times in sorted(actions.items())
+        },
+        "session_retained_bytes": float(np.mean([i["retained"] for i in results])),
+        "session_peak_bytes": float(np.mean([i["peak"] for i in results])),
+        "session_state_bytes": float(np.mean([i["state"] for i in results])),
+        "errors": errors,
+    }
+
+    print(
+        f"{args.sessions} sessions on {workers} workers, {len(reruns)} reruns in {elapsed:.1f} s"
+    )
+    print(f"Throughput {report['throughput']:.1f} reruns/s")
+    print(f"Census requests {server.requests} at {args.latency * 1000:.0f} ms each")
+    print(f"\n{'':15} {'samples':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, row in [("all", report["reruns"]), *report["actions"].items()]:
+        print(
+            f"{name:15} {row['samples']:8} {row['p50_ms']:10.1f} {row['p95_ms']:10.1f} {row['p99_ms']:10.1f}"
+        )
+    print(
+        f"\nMemory per session {report['session_retained_bytes'] / 1024:.0f} KiB retained, {report['session_peak_bytes'] / 1024:.0f} KiB at peak, {report['session_state_bytes'] / 1024:.1f} KiB of it in session state"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if errors:
+        print(f"\n{len(errors)} errors")
+        for error in errors[:10]:
+            print(error)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
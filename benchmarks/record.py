@@ -0,0 +1,28 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog  # noqa: E402
+import census  # noqa: E402
+from benchmarks.fixtures import DIR  # noqa: E402
+
+
+def main():
+    """
+    Records the real API responses for every indicator in the manifest into the fixtures directory, so benchmarks run offline on real data
+    """
+    os.makedirs(DIR, exist_ok=True)
+    for geography in census.GEOGRAPHIES:
+        responses = [
+            census.request(batch, geography)
+            for batch in census.batches(list(catalog.load()))
+        ]
+        with open(os.path.join(DIR, f"{geography}.json"), "w") as f:
+            json.dump(responses, f)
+        print(f"Recorded {len(responses)} {geography} responses to {DIR}")
+
+
+if __name__ == "__main__":
+    main()
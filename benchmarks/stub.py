@@ -0,0 +1,145 @@
+import argparse
+import functools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+
+ROUTE = re.compile(r"/data/(\d{4})/acs/acs[15]/subject")
+COUNTIES = "/counties.geojson"
+MAX_VARIABLES = 50
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == COUNTIES:
+            self.server.wait()
+            return self.reply(200, self.server.counties())
+        route = ROUTE.fullmatch(url.path)
+        if route is None:
+            return self.reply(404, "error: unknown/unsupported geography hierarchy")
+        names = query.get("get", [""])[0].split(",")
+        geography = query.get("for", [""])[0].split(":")[0]
+        if geography not in fixtures.GEOGRAPHIES:
+            return self.reply(400, "error: unknown/unsupported geography hierarchy")
+        if len(names) > MAX_VARIABLES:
+            return self.reply(
+                400, f"error: you may request at most {MAX_VARIABLES} variables"
+            )
+        self.server.wait()
+        codes = [name for name in names if name != "NAME"]
+        self.reply(200, json.dumps(fixtures.response(geography, codes, int(route[1]))))
+
+    def reply(self, status: int, body: str):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header(
+            "Content-Type", "application/json" if status == 200 else "text/plain"
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0):
+        """
+        Creates a stand-in for the Census subject tables endpoint, answering with the fixtures on localhost after a simulated network delay
+
+        Args:
+            port (int): The port to listen on, any free port if 0
+            latency (float): The seconds every response is delayed by
+            jitter (float): The most seconds added on top of latency at random
+        """
+        super().__init__(("127.0.0.1", port), Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def urls(self):
+        """
+        The environment variables that point the app at this server
+
+        Returns:
+            dict: The URL of the state and county data and of the county boundaries, by environment variable
+        """
+        root = f"http://127.0.0.1:{self.server_address[1]}"
+        return {
+            "STATEPROJECT_CENSUS_URL": f"{root}/data/{{year}}/acs/acs1/subject",
+            "STATEPROJECT_COUNTY_URL": f"{root}/data/{{year}}/acs/acs5/subject",
+            "STATEPROJECT_COUNTIES_URL": f"{root}{COUNTIES}",
+        }
+
+    @functools.cache
+    def counties(self):
+        """
+        Serializes the made up county boundaries once
+
+        Returns:
+            str: The GeoJSON document
+        """
+        return json.dumps(fixtures.counties())
+
+    def wait(self):
+        """
+        Counts a request and sleeps for its simulated delay
+        """
+        with self.lock:
+            self.requests += 1
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def start(self):
+        """
+        Serves on a daemon thread
+
+        Returns:
+            Server: The server itself
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serves the Census fixtures on localhost, point the printed environment variables at it"
+    )
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds to delay every response"
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Most seconds added to the delay at random",
+    )
+    args = parser.parse_args()
+    server = Server(args.port, args.latency, args.jitter)
+    for name, url in server.urls.items():
+        print(f"{name}={url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
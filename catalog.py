@@ -0,0 +1,47 @@
+import json
+import os
+from functools import cache
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "indicators.json")
+
+
+@cache
+def load(path: str = PATH):
+    """
+    Reads the indicator manifest once per process
+
+    Args:
+        path (str): The path of the JSON manifest, a list of objects holding the arguments of a SingleState besides states. Share ids are permanent, a removed indicator's share id must never be given to another one
+    Returns:
+        dict: Every manifest entry keyed by its code, ordered by category and then by friendly name
+    """
+    with open(path) as f:
+        entries = json.load(f)
+    catalog = {}
+    share_ids = set()
+    for i in sorted(entries, key=lambda i: (i["category"], i["friendly_name"])):
+        if i["code"] in catalog:
+            raise ValueError(f"{i['code']} is listed more than once in {path}")
+        if i["share_id"] in share_ids:
+            raise ValueError(
+                f"Share id {i['share_id']} is used more than once in {path}"
+            )
+        catalog[i["code"]] = i
+        share_ids.add(i["share_id"])
+    return catalog
+
+
+@cache
+def categories(path: str = PATH):
+    """
+    Groups the codes of the indicator manifest by category
+
+    Args:
+        path (str): The path of the JSON manifest
+    Returns:
+        dict: The codes of every category in display order, keyed by category name in alphabetical order
+    """
+    grouped = {}
+    for code, i in load(path).items():
+        grouped.setdefault(i["category"], []).append(code)
+    return grouped
@@ -0,0 +1,336 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+import profiling
+from diskstore import Store
+from limiter import Limiter
+
+BASE_URL = os.environ.get(
+    "STATEPROJECT_CENSUS_URL", "https://api.census.gov/data/{year}/acs/acs1/subject"
+)
+URLS = {
+    "state": BASE_URL,
+    "county": os.environ.get(
+        "STATEPROJECT_COUNTY_URL", BASE_URL.replace("/acs1/", "/acs5/")
+    ),
+}
+GEOGRAPHIES = {"state": ["state"], "county": ["state", "county"]}
+YEAR = int(os.environ.get("STATEPROJECT_YEAR", 2023))
+YEARS = os.environ.get("STATEPROJECT_YEARS", f"{YEAR - 6}-{YEAR}")
+UNRELEASED = [2020]
+BARE_YEAR = 2023
+MAX_VARIABLES = 50
+EXCLUDED = ["11", "72"]
+SENTINELS = [-999999999, -888888888, -666666666, -555555555, -333333333, -222222222]
+KEEP = np.ones(100, dtype=bool)
+KEEP[[int(i) for i in EXCLUDED]] = False
+TIMEOUT = 10
+WORKERS = int(os.environ.get("STATEPROJECT_WORKERS", 8))
+CONCURRENCY = int(os.environ.get("STATEPROJECT_CONCURRENCY", WORKERS))
+RATE = float(os.environ.get("STATEPROJECT_RATE", 20))
+
+DATA_DIR = os.environ.get(
+    "STATEPROJECT_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"),
+)
+TTL = float(os.environ.get("STATEPROJECT_TTL", 7 * 24 * 60 * 60))
+OFFLINE = os.environ.get("STATEPROJECT_OFFLINE", "").lower() in ["1", "true", "yes"]
+
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=WORKERS))
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=WORKERS))
+store = Store(os.path.join(DATA_DIR, "census.sqlite3"))
+limiter = Limiter("census", CONCURRENCY, RATE)
+refreshing = set()
+refreshing_lock = threading.Lock()
+inflight = {}
+inflight_lock = threading.Lock()
+
+
+def batches(codes: list):
+    """
+    Splits a list of codes into groups small enough to be requested together with NAME
+
+    Args:
+        codes (list): The codes that identify the tables to take US Census data from
+    Returns:
+        list: A list of lists, each holding at most MAX_VARIABLES - 1 codes
+    """
+    size = MAX_VARIABLES - 1
+    return [codes[i : i + size] for i in range(0, max(len(codes), 1), size)]
+
+
+def years(spec: str = YEARS, geography: str = "state"):
+    """
+    Lists the releases in a range of years. The 1-year estimates that were never released are skipped for geographies served from the 1-year tables, while the 5-year tables of counties have every year
+
+    Args:
+        spec (str): Years and ranges separated by commas, like "2017-2023" or "2019,2021-2023"
+        geography (str): "state" or "county"
+    Returns:
+        list: The years in ascending order
+    """
+    found = set()
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        found.update(range(int(first), int(last or first) + 1))
+    if "/acs1/" in URLS[geography]:
+        found.difference_update(UNRELEASED)
+    return sorted(found)
+
+
+def key(code: str, geography: str, year: int = YEAR):
+    """
+    Names the entry of a code in the on-disk store, which always holds the year so changing YEAR never serves the stats of another release
+
+    Args:
+        code (str): "NAME" or the code that identifies the table to take US Census data from
+        geography (str): "state" or "county"
+        year (int): The year of the release
+    Returns:
+        str: The key of the entry
+    """
+    prefix = "" if geography == "state" else f"{geography}:"
+    return f"{prefix}{year}:{code}"
+
+
+@cache
+def migrate():
+    """
+    Moves the entries stored under a bare code, from before every key held its year, to the keys of BARE_YEAR, the release they were written for. Only the first call of a process looks at the store
+    """
+    bare = {}
+    for k in store.keys():
+        geography, _, code = k.rpartition(":")
+        if ":" not in geography and not geography.isdigit():
+            bare[k] = key(code, geography or "state", BARE_YEAR)
+    if bare:
+        store.rename(bare)
+
+
+def request(batch: list, geography: str = "state", year: int = YEAR):
+    """
+    Requests one batch of codes from the API over the shared keep-alive session
+
+    Args:
+        batch (list): The codes to be requested together with NAME
+        geography (str): "state" for one row per state or "county" for one row per county, counties coming from the 5-year estimates since the 1-year estimates skip small counties
+        year (int): The year of the release
+    Returns:
+        list: The decoded response, a header row followed by one row per place
+    """
+    with limiter, profiling.span("census.request"):
+        profiling.count("census requests")
+        response = session.get(
+            f"{URLS[geography].format(year=year)}?get={','.join(['NAME', *batch])}&for={geography}:*",
+            timeout=TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def columnar(data: list):
+    """
+    Converts one response of the API into typed NumPy columns in one pass over its rows, leaving out the excluded states and their counties with the KEEP mask. Responses for one code or many are read the same way
+
+    Args:
+        data (list): The decoded response, a header row of NAME, the codes and "state" or "state" and "county", followed by one row per place
+    Returns:
+        tuple: The codes in the response, the full FIPS code of each kept place, their names and their stats with one column per code. Stats that are null, a Census sentinel or not a number are missing
+    """
+    header = data[0]
+    tail = len(GEOGRAPHIES[header[-1]])
+    rows = np.array(data[1:], dtype=object).reshape(len(data) - 1, len(header))
+    places = rows[:, -tail:].astype(np.int64)
+    keep = KEEP[places[:, 0]]
+    fips = places[keep] @ 1000 ** np.arange(tail - 1, -1, -1)
+    block = rows[keep, 1:-tail]
+    try:
+        stats = block.astype(float)
+    except (TypeError, ValueError):
+        stats = (
+            pd.DataFrame(block)
+            .apply(pd.to_numeric, errors="coerce")
+            .to_numpy(dtype=float, copy=True)
+        )
+    stats[np.isin(stats, SENTINELS)] = np.nan
+    return header[1:-tail], fips, rows[keep, 0], stats
+
+
+def parse(data: list, columns: dict):
+    """
+    Reads one response of the API into columns, leaving out the excluded states and their counties. Places are keyed by their full FIPS code, so a county is its state code followed by its three digit county code
+
+    Args:
+        data (list): The decoded response, a header row of NAME, the codes and "state" or "state" and "county", followed by one row per place
+        columns (dict): The columns to fill, keyed by "NAME" or the code and then by the FIPS code of each place. Missing stats are NaN
+    """
+    codes, fips, names, stats = columnar(data)
+    fips = fips.tolist()
+    columns.setdefault("NAME", {}).update(zip(fips, names.tolist()))
+    for position, code in enumerate(codes):
+        columns.setdefault(code, {}).update(zip(fips, stats[:, position].tolist()))
+
+
+def fetch(codes: list, geography: str = "state", year: int = YEAR):
+    """
+    Fetches the data of every US Census table in codes from the API using as few requests as it allows, sending the requests concurrently
+
+    Args:
+        codes (list): The codes that identify the tables to take US Census data from
+        geography (str): "state" or "county"
+        year (int): The year of the release
+    Returns:
+        dict: The place names and the stats of every code, each keyed by the FIPS code of each place and stored under "NAME" or the code
+    """
+    codes = list(dict.fromkeys(codes))
+    columns = {"NAME": {}} | {code: {} for code in codes}
+    groups = batches(codes)
+    with ThreadPoolExecutor(max_workers=min(WORKERS, len(groups))) as pool:
+        responses = list(
+            pool.map(request, groups, [geography] * len(groups), [year] * len(groups))
+        )
+    for data in responses:
+        parse(data, columns)
+    return columns
+
+
+def download(codes: list, geography: str = "state", year: int = YEAR):
+    """
+    Fetches codes from the API and writes them to the on-disk store
+
+    Args:
+        codes (list): The codes that identify the tables to take US Census data from
+        geography (str): "state" or "county"
+        year (int): The year of the release
+    Returns:
+        dict: The fetched columns, as returned by fetch
+    """
+    columns = fetch(codes, geography, year)
+    store.put({key(code, geography, year): value for code, value in columns.items()})
+    return columns
+
+
+def coalesce(codes: list, geography: str = "state", year: int = YEAR):
+    """
+    Downloads codes like download, except that a code another thread is already downloading is not requested again, this thread waits for that download instead. Every code is requested at most once at a time per process
+
+    Args:
+        codes (list): "NAME" or the codes that identify the tables to take US Census data from
+        geography (str): "state" or "county"
+        year (int): The year of the release
+    Returns:
+        dict: The columns of every code in codes, keyed by "NAME" or the code and then by the FIPS code of each place
+    """
+    claimed = {}
+    waiting = {}
+    with inflight_lock:
+        for code in codes:
+            k = key(code, geography, year)
+            if k in inflight:
+                waiting[code] = inflight[k]
+            else:
+                claimed[code] = inflight[k] = Future()
+    if waiting:
+        profiling.count("census coalesced", len(waiting))
+    columns = {}
+    if claimed:
+        keys = {key(code, geography, year): code for code in claimed}
+        try:
+            columns = {
+                keys[k]: {int(fips): v for fips, v in value.items()}
+                for k, (_, value) in store.get(list(keys)).items()
+            }
+            rest = [code for code in claimed if code not in columns]
+            if rest:
+                columns |= download(
+                    [code for code in rest if code != "NAME"], geography, year
+                )
+        except BaseException as e:
+            for future in claimed.values():
+                future.set_exception(e)
+            raise
+        finally:
+            with inflight_lock:
+                for k in keys:
+                    inflight.pop(k, None)
+        for code, future in claimed.items():
+            future.set_result(columns[code])
+    return {code: columns[code] for code in claimed} | {
+        code: future.result() for code, future in waiting.items()
+    }
+
+
+def revalidate(codes: list, geography: str = "state", year: int = YEAR):
+    """
+    Refreshes stale codes on a background thread, skipping codes that are already being refreshed
+
+    Args:
+        codes (list): The codes whose stored data is older than TTL
+        geography (str): "state" or "county"
+        year (int): The year of the release
+    """
+    with refreshing_lock:
+        codes = [code for code in codes if (geography, year, code) not in refreshing]
+        refreshing.update((geography, year, code) for code in codes)
+    if not codes:
+        return
+
+    def run():
+        try:
+            download([code for code in codes if code != "NAME"], geography, year)
+        except requests.RequestException:
+            pass
+        finally:
+            with refreshing_lock:
+                refreshing.difference_update((geography, year, code) for code in codes)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def load(codes: list, geography: str = "state", year: int = YEAR):
+    """
+    Loads the data of every US Census table in codes, serving from the on-disk store whenever it can. Stale data is served as is and refreshed in the background, missing data is fetched before returning. In offline mode only the store is used.
+
+    Args:
+        codes (list): The codes that identify the tables to take US Census data from
+        geography (str): "state" or "county"
+        year (int): The year of the release
+    Returns:
+        DataFrame: A Pandas DataFrame indexed by the FIPS code of each place, with a column of place names and one column of stats per code
+    """
+    migrate()
+    codes = list(dict.fromkeys(codes))
+    keys = {key(code, geography, year): code for code in ["NAME", *codes]}
+    with profiling.span("census.store"):
+        stored = store.get(list(keys))
+    columns = {
+        keys[k]: {int(fips): v for fips, v in value.items()}
+        for k, (_, value) in stored.items()
+    }
+    missing = [code for k, code in keys.items() if k not in stored]
+    if missing and OFFLINE:
+        raise LookupError(
+            f"Offline mode is on and {', '.join(missing)} has never been stored for every {geography} in {year} in {DATA_DIR}"
+        )
+    if missing:
+        columns |= coalesce(missing, geography, year)
+    stale = [
+        keys[k] for k, (fetched, _) in stored.items() if time.time() - fetched > TTL
+    ]
+    if stale and not OFFLINE:
+        revalidate(stale, geography, year)
+    data = pd.DataFrame(
+        {"NAME": pd.Series(columns["NAME"])}
+        | {code: pd.Series(columns[code], dtype=float) for code in codes}
+    )
+    data.index.name = "code"
+    return data
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+import catalog
+import census
+import matrix
+import normalize
+from scoring import Engine
+from sharecode import MAX_POINTS, decode_many, decode_weights, encode_weights
+
+
+def load(codes: list = None, geography: str = "state", method: str = normalize.DEFAULT):
+    """
+    Loads the data of every indicator in the manifest, or only of the codes arg, into a fully populated scoring engine. The whole manifest is served from the shared memory-mapped matrix. Nothing here depends on Streamlit
+
+    Args:
+        codes (list): The codes to load, every code in the manifest if left out
+        geography (str): "state" to score states or "county" to score counties
+        method (str): The key of the normalization method in normalize.METHODS
+    Returns:
+        Engine: An Engine object with a normalized column for every code
+    """
+    entries = catalog.load()
+    if codes is None:
+        return matrix.engine(entries, geography).normalized(method)
+    codes = list(codes)
+    data = census.load(codes, geography)
+    engine = Engine(data["NAME"], method)
+    engine.add(data, {code: entries[code]["invert"] for code in codes})
+    return engine
+
+
+def weights(code: str):
+    """
+    Turns a share code into the weight of every indicator in the manifest. Codes that cannot be decoded or use more than MAX_POINTS points raise ValueError, the same codes decode_many marks invalid
+
+    Args:
+        code (str): The share code, versioned or legacy
+    Returns:
+        dict: The weight of every code in the manifest, zero for indicators missing from the share code
+    """
+    decoded = decode_weights(code)
+    total = sum(decoded.values())
+    if total > MAX_POINTS:
+        raise ValueError(f"{code} uses {total} points, more than {MAX_POINTS}")
+    return {code: decoded.get(i["share_id"], 0) for code, i in catalog.load().items()}
+
+
+def share(values: dict):
+    """
+    Turns the weight of each indicator into a versioned share code
+
+    Args:
+        values (dict): The weight of each code
+    Returns:
+        str: The share code
+    """
+    entries = catalog.load()
+    return encode_weights(
+        {entries[code]["share_id"]: value for code, value in values.items()}
+    )
+
+
+def rank(engine: Engine, values):
+    """
+    Ranks every state from the highest total score to the lowest
+
+    Args:
+        engine (Engine): The Engine object to score with
+        values (dict | str): The weight of each code, or a share code
+    Returns:
+        DataFrame: A Pandas DataFrame with columns of rank, state name and total score
+    """
+    if isinstance(values, str):
+        values = weights(values)
+    data = engine.score(values).sort_values(
+        by="score", ascending=False, kind="stable", ignore_index=True
+    )
+    data.insert(0, "rank", np.arange(1, len(data) + 1))
+    return data[["rank", "NAME", "score"]]
+
+
+def score_many(engine: Engine, matrix, codes: list = None):
+    """
+    Scores many weight vectors with one matrix product
+
+    Args:
+        engine (Engine): The Engine object to score with
+        matrix (ndarray): One row of weights per vector, one column per code
+        codes (list): The codes of the columns of matrix, every code in the manifest if left out
+    Returns:
+        ndarray: A NumPy array with one row of total scores per vector, one column per state in the order of engine.names
+    """
+    codes = list(catalog.load()) if codes is None else list(codes)
+    columns = np.column_stack([engine.columns[code] for code in codes])
+    return np.asarray(matrix, dtype=float) @ columns.T
+
+
+def rank_many(engine: Engine, codes: list, top: int = None):
+    """
+    Ranks the states for many share codes in one vectorized pass
+
+    Args:
+        engine (Engine): The Engine object to score with
+        codes (list): The share codes
+        top (int): How many states to keep per code, every state if left out
+    Returns:
+        DataFrame: A Pandas DataFrame with columns of share code, rank, state name and total score, ranked from the highest score within each code. Invalid codes are left out and listed in the attrs of the DataFrame under "invalid"
+    """
+    matrix = decode_many(codes, [i["share_id"] for i in catalog.load().values()])
+    valid = (matrix >= 0).all(axis=1)
+    invalid = [code for code, ok in zip(codes, valid) if not ok]
+    codes = np.asarray(codes, dtype=object)[valid]
+    scores = score_many(engine, matrix[valid])
+    top = scores.shape[1] if top is None else min(top, scores.shape[1])
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :top]
+    data = pd.DataFrame(
+        {
+            "code": np.repeat(codes, top),
+            "rank": np.tile(np.arange(1, top + 1), len(codes)),
+            "NAME": engine.names[order].ravel(),
+            "score": np.take_along_axis(scores, order, axis=1).ravel(),
+        }
+    )
+    data.attrs["invalid"] = invalid
+    return data
@@ -0,0 +1,92 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+
+class Store:
+    def __init__(self, path: str):
+        """
+        Creates a Store object that keeps JSON values on disk in a SQLite database, along with the time each one was written
+
+        Args:
+            path (str): The path of the SQLite database, created along with its directory on first use
+        """
+        self.path = path
+        self.ready = False
+
+    def connect(self):
+        """
+        Opens a connection to the database, creating it first if needed
+
+        Returns:
+            Connection: A new SQLite connection, to be closed by the caller
+        """
+        if not self.ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        con = sqlite3.connect(self.path, timeout=30)
+        if not self.ready:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, fetched REAL NOT NULL, body TEXT NOT NULL)"
+            )
+            self.ready = True
+        return con
+
+    def get(self, keys: list):
+        """
+        Reads every stored value in keys
+
+        Args:
+            keys (list): The keys to look up
+        Returns:
+            dict: The time each found key was written and its value, keyed by key. Keys that were never stored are left out
+        """
+        if not keys:
+            return {}
+        with closing(self.connect()) as con:
+            rows = con.execute(
+                f"SELECT key, fetched, body FROM responses WHERE key IN ({','.join('?' * len(keys))})",
+                list(keys),
+            ).fetchall()
+        return {key: (fetched, json.loads(body)) for key, fetched, body in rows}
+
+    def put(self, values: dict):
+        """
+        Writes every value in values, replacing what was stored under the same key
+
+        Args:
+            values (dict): The values to be stored, keyed by key
+        """
+        now = time.time()
+        with closing(self.connect()) as con, con:
+            con.executemany(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                [(key, now, json.dumps(value)) for key, value in values.items()],
+            )
+
+    def keys(self):
+        """
+        Lists every stored key
+
+        Returns:
+            list: The keys, in no particular order
+        """
+        with closing(self.connect()) as con:
+            return [key for (key,) in con.execute("SELECT key FROM responses")]
+
+    def rename(self, keys: dict):
+        """
+        Moves stored values to new keys, keeping the time each one was written. A value whose new key is already taken is dropped in favor of the one stored there
+
+        Args:
+            keys (dict): The new key of every key to move, keyed by the old key
+        """
+        with closing(self.connect()) as con, con:
+            con.executemany(
+                "UPDATE OR IGNORE responses SET key = ? WHERE key = ?",
+                [(new, old) for old, new in keys.items()],
+            )
+            con.executemany(
+                "DELETE FROM responses WHERE key = ?", [(old,) for old in keys]
+            )
@@ -23,7 +23,7 @@ def main():
     )
     st.subheader("How do I use it?")
     st.write(
-        "On the left, there should be a few titled boxes to input numbers. You can input any number between 1 and 1000, and I invite you to do so now if you haven’t already. When you input a number in that box, you are changing the maximum [or minimum if the data set is inverse] of the function to the inputted value. You should see the graph on the right update in response. The graph on the right is called a [choropleth map](https://en.wikipedia.org/wiki/Choropleth_map) ([despite the visual similarity, it is not a heat map](https://www.standardco.de/notes/heatmaps-vs-choropleths)). The intensity of the blue color in each state on the map is inversely proportional to its score value (calculated by adding up the points it received in each category on the left based on your input ranges). Essentially, lighter blue = better score. You can see the specific score associated with each state by hovering over said state, along with zooming and moving around the map. When you changed those variables, you also should have noticed the text at the bottom that says “Your current code is XXXX” change. This code system is designed to facilitate easy retention and distribution of scores among others despite the fact that this is a web app primarily. This code is based off of the numbers you input into the boxes on the left. At this point I invite you to remember or copy your code, refresh the page, input the code into the box that says “If you have a code, put it here!”, and press enter on your keyboard or hit “Apply.” You should see numbers identical to the ones before refreshing your page!"
+        "On the left, there should be a few titled boxes to input numbers. You can input any number between 1 and 1000, and I invite you to do so now if you haven’t already. When you input a number in that box, you are changing the maximum [or minimum if the data set is inverse] of the function to the inputted value. You should see the graph on the right update in response. The graph on the right is called a [choropleth map](https://en.wikipedia.org/wiki/Choropleth_map) ([despite the visual similarity, it is not a heat map](https://www.standardco.de/notes/heatmaps-vs-choropleths)). The intensity of the blue color in each state on the map is inversely proportional to its score value (calculated by adding up the points it received in each category on the left based on your input ranges). Essentially, lighter blue = better score. You can see the specific score associated with each state by hovering over said state, along with zooming and moving around the map. When you changed those variables, you also should have noticed the text at the bottom that says “Your current code is XXXX” change. This code system is designed to facilitate easy retention and distribution of scores among others despite the fact that this is a web app primarily. This code is based off of the numbers you input into the boxes on the left. At this point I invite you to remember or copy your code, refresh the page, input the code into the box that says “If you have a code, put it here!”, and press enter on your keyboard or hit “Apply.” You should see numbers identical to the ones before refreshing your page! The address of the page also carries your current code, so you can simply share the link instead. If you would rather compare counties than states, turn on county scoring on the Settings page. Turning on the year slider there shows the last several years of releases, with a Play button that steps through them and a table of how far each place climbed or fell. Below the table, “How stable are these ranks?” ranks every place under many random weightings of the categories you use, a hundred thousand for states and ten thousand for counties, so you can see which ranks hold up no matter how the points are split. The Settings page also lets you pick how each category is rescaled before your points are applied. Besides min-max normalization there are z-scores, percentile ranks and a robust scale built on the median and the interquartile range, which keep a few extreme places, common with categories like income, from squeezing everyone else together."
     )
     st.write("\n\n\n")
     st.write("Happy data analysis!\n\n-Link")
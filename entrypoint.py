@@ -1,5 +1,8 @@
+import numpy as np
 import streamlit as st
 
+import warmup
+
 
 def session_state_create(name: str, value: int):
     if name not in st.session_state:
@@ -22,14 +25,25 @@ session_state_create("table_round_retention", 2)
 session_state_create("graph_cscale_toggle", False)
 session_state_create("graph_cscale_value", "reds")
 session_state_create("graph_cscale_retention", "reds")
-session_state_create("states", {})
+session_state_create("states", np.zeros(0, dtype=np.int32))
 session_state_create("processed_keys", [])
+session_state_create("code_pending", "")
+session_state_create("code_linked", False)
+session_state_create("county_mode", False)
+session_state_create("time_mode", False)
+session_state_create("sensitivity_mode", False)
+session_state_create("normalization", "minmax")
 session_state_create_mass(7, 0)
 
+warmup.start()
+
 main = st.Page("main.py", title="Main")
 documentation = st.Page("documentation.py", title="Documentation")
 settings = st.Page("settings.py", title="Settings")
 
 pg = st.navigation([main, documentation, settings])
 st.set_page_config(page_title="States Statistics Viewer", page_icon=":material/edit:")
+if pg == main and not warmup.ready.is_set():
+    with st.spinner("Getting the data ready"):
+        warmup.wait()
 pg.run()
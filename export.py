@@ -0,0 +1,271 @@
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.offline
+from plotly.io.json import to_json_plotly
+
+import core
+import geo
+import maps
+import normalize
+from score import read
+
+WORKERS = os.cpu_count() or 1
+PLOTLYJS = "plotly.min.js"
+COUNTIES = "counties.geojson"
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ background: #0e1117; color: #fafafa; font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ padding: 0.25em 1em; border-bottom: 1px solid #31333f; text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{figure}
+{table}
+</body>
+</html>
+"""
+
+context = {}
+
+
+def atomic(path: str, text: str):
+    """
+    Writes a text file under a temporary name first, so a static file server never serves half of it
+
+    Args:
+        path (str): The path of the file
+        text (str): The contents of the file
+    """
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+def prepare(
+    geography: str,
+    cscale: str,
+    rounding: int,
+    output: str,
+    inline: bool = False,
+    method: str = normalize.DEFAULT,
+):
+    """
+    Loads the scoring engine and builds the base map once per process, before it exports any share code
+
+    Args:
+        geography (str): "state" or "county"
+        cscale (str): The color scale of the map
+        rounding (int): The decimal places of the scores in the table
+        output (str): The folder the bundles are written to
+        inline (bool): Whether every page carries plotly.js and the county boundaries instead of pointing at the shared copies in output
+        method (str): The key of the normalization method in normalize.METHODS
+    """
+    engine = core.load(geography=geography, method=method)
+    context.update(
+        engine=engine,
+        base=maps.base(
+            engine,
+            cscale,
+            geography,
+            None if inline or geography == "state" else COUNTIES,
+        ),
+        geography=geography,
+        rounding=rounding,
+        output=output,
+        plotlyjs=True if inline else PLOTLYJS,
+    )
+
+
+def bundle(code: str):
+    """
+    Scores one share code and writes its bundle: <code>.html, a page with the map and the ranked table that needs nothing but a static file server, and <code>.json, the weights, the ranking and the map as a Plotly figure for pages that draw it themselves
+
+    Args:
+        code (str): The share code
+    Returns:
+        tuple: The share code and the name of the top place, or None and the error if the code is invalid
+    """
+    try:
+        values = core.weights(code)
+    except ValueError as e:
+        return None, str(e)
+    engine = context["engine"]
+    geography = context["geography"]
+    ranking = core.rank(engine, values)
+    fig = maps.figure(context["base"], engine.score(values))
+    title = f"{geography.title()} ranking for {code}"
+    table = ranking.rename(
+        columns={
+            "rank": "Rank",
+            "NAME": f"{geography.title()} Name",
+            "score": "Total Score",
+        }
+    ).to_html(
+        index=False,
+        border=0,
+        float_format=f"{{:.{context['rounding']}f}}".format,
+    )
+    path = os.path.join(context["output"], code)
+    atomic(
+        f"{path}.html",
+        PAGE.format(
+            title=html.escape(title),
+            figure=fig.to_html(
+                full_html=False, include_plotlyjs=context["plotlyjs"], validate=False
+            ),
+            table=table,
+        ),
+    )
+    atomic(
+        f"{path}.json",
+        to_json_plotly(
+            {
+                "code": code,
+                "share": core.share(values),
+                "geography": geography,
+                "weights": {key: value for key, value in values.items() if value},
+                "ranking": ranking.to_dict(orient="records"),
+                "figure": fig.to_plotly_json(),
+            }
+        ),
+    )
+    return code, ranking["NAME"].iloc[0] if len(ranking) else None
+
+
+def export(
+    codes: list,
+    output: str,
+    geography: str = "state",
+    cscale: str = "reds",
+    rounding: int = 2,
+    workers: int = WORKERS,
+    inline: bool = False,
+    method: str = normalize.DEFAULT,
+):
+    """
+    Writes a static bundle for every share code into output, spread across a process pool, along with the files the bundles share and an index.json listing them
+
+    Args:
+        codes (list): The share codes, duplicates are exported once
+        output (str): The folder the bundles are written to, created if missing
+        geography (str): "state" or "county"
+        cscale (str): The color scale of the maps
+        rounding (int): The decimal places of the scores in the tables
+        workers (int): The amount of processes, the bundles are written in this process if 1
+        inline (bool): Whether every page carries plotly.js and the county boundaries, so each page works on its own
+        method (str): The key of the normalization method in normalize.METHODS
+    Returns:
+        dict: The index, with the top place of every exported code and the error of every invalid one
+    """
+    os.makedirs(output, exist_ok=True)
+    if not inline:
+        atomic(os.path.join(output, PLOTLYJS), plotly.offline.get_plotlyjs())
+        if geography == "county":
+            geo.counties()
+            shutil.copyfile(geo.PATH, os.path.join(output, COUNTIES))
+    codes = list(dict.fromkeys(code.strip() for code in codes if code.strip()))
+    arguments = (geography, cscale, rounding, output, inline, method)
+    if workers > 1 and len(codes) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(codes)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=prepare,
+            initargs=arguments,
+        ) as pool:
+            results = list(
+                pool.map(bundle, codes, chunksize=max(len(codes) // (workers * 4), 1))
+            )
+    else:
+        prepare(*arguments)
+        results = list(map(bundle, codes))
+    found = {
+        "geography": geography,
+        "normalization": method,
+        "codes": {},
+        "invalid": {},
+    }
+    for code, (done, top) in zip(codes, results):
+        if done is None:
+            found["invalid"][code] = top
+        else:
+            found["codes"][code] = {
+                "html": f"{code}.html",
+                "json": f"{code}.json",
+                "top": top,
+            }
+    atomic(os.path.join(output, "index.json"), json.dumps(found, indent=1))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Writes a map and ranked table bundle for every share code in a file, for serving from a static file server without Streamlit"
+    )
+    parser.add_argument(
+        "codes", help='File with one share code per line, "-" for standard input'
+    )
+    parser.add_argument(
+        "-o", "--output", required=True, help="Folder the bundles are written to"
+    )
+    parser.add_argument(
+        "--geography",
+        choices=["state", "county"],
+        default="state",
+        help="Rank states or counties",
+    )
+    parser.add_argument(
+        "--normalization",
+        choices=list(normalize.METHODS),
+        default=normalize.DEFAULT,
+        help="How indicators are rescaled before scoring",
+    )
+    parser.add_argument("--cscale", default="reds", help="Color scale of the maps")
+    parser.add_argument(
+        "--round",
+        type=int,
+        default=2,
+        help="Decimal places of the scores in the tables",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=WORKERS, help="How many processes to use"
+    )
+    parser.add_argument(
+        "--inline",
+        action="store_true",
+        help="Put plotly.js and the county boundaries in every page instead of one shared copy",
+    )
+    args = parser.parse_args()
+    found = export(
+        read(args.codes),
+        args.output,
+        args.geography,
+        args.cscale,
+        args.round,
+        args.workers,
+        args.inline,
+        args.normalization,
+    )
+    for code, error in found["invalid"].items():
+        print(f"Skipped {code}: {error}", file=sys.stderr)
+    print(
+        f"Exported {len(found['codes'])} share codes to {args.output}", file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+import census
+
+COUNTIES_URL = os.environ.get(
+    "STATEPROJECT_COUNTIES_URL",
+    "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json",
+)
+PATH = os.path.join(census.DATA_DIR, "counties.geojson")
+STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIGITS = 2
+
+STATES = {
+    1: "AL",
+    2: "AK",
+    4: "AZ",
+    5: "AR",
+    6: "CA",
+    8: "CO",
+    9: "CT",
+    10: "DE",
+    11: "DC",
+    12: "FL",
+    13: "GA",
+    15: "HI",
+    16: "ID",
+    17: "IL",
+    18: "IN",
+    19: "IA",
+    20: "KS",
+    21: "KY",
+    22: "LA",
+    23: "ME",
+    24: "MD",
+    25: "MA",
+    26: "MI",
+    27: "MN",
+    28: "MS",
+    29: "MO",
+    30: "MT",
+    31: "NE",
+    32: "NV",
+    33: "NH",
+    34: "NJ",
+    35: "NM",
+    36: "NY",
+    37: "NC",
+    38: "ND",
+    39: "OH",
+    40: "OK",
+    41: "OR",
+    42: "PA",
+    44: "RI",
+    45: "SC",
+    46: "SD",
+    47: "TN",
+    48: "TX",
+    49: "UT",
+    50: "VT",
+    51: "VA",
+    53: "WA",
+    54: "WV",
+    55: "WI",
+    56: "WY",
+    60: "AS",
+    66: "GU",
+    69: "MP",
+    72: "PR",
+    78: "VI",
+}
+
+
+def ring(points: list, digits: int = DIGITS):
+    """
+    Rounds the points of a polygon ring and drops every point that rounds onto the one before it. Rings that would lose their shape are only rounded
+
+    Args:
+        points (list): The ring as a list of longitude and latitude pairs
+        digits (int): The decimal places to keep, 2 is about a kilometer
+    Returns:
+        list: The simplified ring
+    """
+    array = np.round(np.asarray(points, dtype=float), digits)
+    keep = np.ones(len(array), dtype=bool)
+    keep[1:] = np.any(array[1:] != array[:-1], axis=1)
+    if keep.sum() < 4:
+        return array.tolist()
+    return array[keep].tolist()
+
+
+def simplify(geojson: dict, digits: int = DIGITS):
+    """
+    Shrinks a GeoJSON feature collection for drawing a national map, simplifying every ring and dropping the properties since features are matched by id
+
+    Args:
+        geojson (dict): The feature collection, changed in place
+        digits (int): The decimal places to keep
+    Returns:
+        dict: The simplified feature collection
+    """
+    for feature in geojson["features"]:
+        geometry = feature["geometry"]
+        polygons = (
+            geometry["coordinates"]
+            if geometry["type"] == "MultiPolygon"
+            else [geometry["coordinates"]]
+        )
+        for polygon in polygons:
+            for n, points in enumerate(polygon):
+                polygon[n] = ring(points, digits)
+        feature["properties"] = {}
+    return geojson
+
+
+def counties():
+    """
+    Loads the county boundaries, keyed by the five digit FIPS code of each county in the id of each feature. They are downloaded and simplified once into DATA_DIR, in offline mode only the stored copy is used
+
+    Returns:
+        dict: The simplified GeoJSON feature collection
+    """
+    try:
+        with open(PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    if census.OFFLINE:
+        raise LookupError(
+            f"Offline mode is on and the county boundaries have never been stored in {census.DATA_DIR}"
+        )
+    response = census.session.get(COUNTIES_URL, timeout=census.TIMEOUT * 6)
+    response.raise_for_status()
+    geojson = simplify(response.json())
+    os.makedirs(os.path.dirname(PATH) or ".", exist_ok=True)
+    temporary = f"{PATH}.{uuid.uuid4().hex}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(geojson, f, separators=(",", ":"))
+    os.replace(temporary, PATH)
+    return geojson
+
+
+def published():
+    """
+    Copies the county boundaries into the static folder that Streamlit serves, named by a hash of their contents. Maps that point at the copy by URL stay small, since the browser fetches the boundaries once instead of receiving them with every rerun
+
+    Returns:
+        str: The URL of the copy, relative to the app
+    """
+    counties()
+    with open(PATH, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:12]
+    name = f"counties-{digest}.geojson"
+    target = os.path.join(STATIC, name)
+    if not os.path.exists(target):
+        os.makedirs(STATIC, exist_ok=True)
+        temporary = f"{target}.{uuid.uuid4().hex}.tmp"
+        shutil.copyfile(PATH, temporary)
+        os.replace(temporary, target)
+    return f"app/static/{name}"
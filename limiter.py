@@ -0,0 +1,52 @@
+import threading
+import time
+
+import profiling
+
+
+class Limiter:
+    def __init__(self, name: str, concurrency: int, rate: float):
+        """
+        Creates a Limiter object that caps how many calls run at once and how many start per second, shared by every thread that enters it in a with block. Calls over the rate wait for their turn, and bursts of up to concurrency calls start at once
+
+        Args:
+            name (str): The name that calls made to wait are counted under, as "<name> throttled"
+            concurrency (int): The most calls running at once
+            rate (float): The most calls started per second on average, no limit if 0
+        """
+        self.name = name
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.rate = rate
+        self.burst = concurrency
+        self.tokens = float(concurrency)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def delay(self):
+        """
+        Takes a token from the bucket, reserving one ahead of time if it is empty
+
+        Returns:
+            float: The seconds to wait before starting the call
+        """
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def __enter__(self):
+        self.slots.acquire()
+        wait = self.delay()
+        if wait:
+            profiling.count(f"{self.name} throttled")
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc):
+        self.slots.release()
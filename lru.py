@@ -0,0 +1,60 @@
+import os
+import threading
+from collections import OrderedDict
+
+import profiling
+
+SIZE = int(os.environ.get("STATEPROJECT_RESULTS", 128))
+
+
+class LRU:
+    def __init__(self, name: str, size: int = SIZE):
+        """
+        Creates an LRU object, a thread-safe cache that keeps the size most recently used values and evicts the least recently used one past that. Calls and misses are counted like the functions wrapped with profiling.cached, and evictions as "<name> evictions"
+
+        Args:
+            name (str): The name that the counters are recorded under
+            size (int): The most values kept
+        """
+        self.name = name
+        self.size = size
+        self.values = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Looks up a value and marks it as the most recently used
+
+        Args:
+            key: The key of the value, any hashable
+        Returns:
+            The value, or None if it is not cached
+        """
+        profiling.count(f"{self.name} calls")
+        with self.lock:
+            value = self.values.get(key)
+            if value is not None:
+                self.values.move_to_end(key)
+                return value
+        profiling.count(f"{self.name} misses")
+        return None
+
+    def put(self, key, value):
+        """
+        Stores a value as the most recently used, evicting the least recently used values past the size
+
+        Args:
+            key: The key of the value, any hashable
+            value: The value, which every caller shares and must not change
+        """
+        with self.lock:
+            self.values[key] = value
+            self.values.move_to_end(key)
+            evicted = max(len(self.values) - self.size, 0)
+            for _ in range(evicted):
+                self.values.popitem(last=False)
+        if evicted:
+            profiling.count(f"{self.name} evictions", evicted)
+
+    def __len__(self):
+        return len(self.values)
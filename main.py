@@ -1,437 +1,543 @@
+import functools
+
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import requests
+import plotly.graph_objects as go
 import streamlit as st
-from numpy import base_repr as br
 
+import catalog
+import census
+import core
+import geo
+import maps
+import matrix
+import normalize
+import profiling
+import sensitivity
+from lru import LRU
+from maps import figure
+from scoring import ranks
 from storeandload import load_value, store_value
 
 
 class SingleState:
+    __slots__ = (
+        "code",
+        "share_id",
+        "friendly_name",
+        "category",
+        "sorting_name",
+        "default_value",
+        "invert",
+        "index",
+    )
+
     def __init__(
         self,
         code: str,
+        share_id: int,
         friendly_name: str,
         category: str,
         sorting_name: str,
         default_value: int,
         invert: bool,
-        states: str,
+        index: int,
     ):
         """
-        Initializes a SingleState object and adds it to a dictionary based on its category. If that category is not present in the dictionary, one is created.
+        Initializes an immutable SingleState object describing one indicator. SingleStates are shared by every session, each session only keeps an array of weights.
 
         Args:
             code (str): The specific code that identifies the table to take US Census data from
+            share_id (int): The permanent number that identifies the SingleState in share codes
             friendly_name (str): The name that will be shown along with a number input associated with this object on the Streamlit webpage
             category (str): The category that the SingleState falls under that will be shown on Streamlit
             sorting_name (str): The name that will be used for sorting all SingleState objects alphabetically within a specific category
             default_value (int): The default value that will be associated with the input on Streamlit
             invert (bool): Indicates if the function is inverse or not
-            states (dict): The dictionary that the SingleState object is added to
+            index (int): The position of the weight of this SingleState in the weights array of each session
         """
-        saved_value = default_value
-        for i in st.session_state[f"_{states}"].values():
-            for p in i:
-                if p.code == code and hasattr(p, "val"):
-                    saved_value = p.val
-                    break
-        for i in st.session_state[f"_{states}"].values():
-            i[:] = [p for p in i if p.code != code]
-        self.code = code
-        self.friendly_name = friendly_name
-        self.category = category
-        self.sorting_name = sorting_name
-        self.default_value = saved_value
-        self.invert = invert
-        try:
-            st.session_state[f"_{states}"][category].append(self)
-        except:
-            st.session_state[f"_{states}"][category] = []
-            st.session_state[f"_{states}"][category].append(self)
+        object.__setattr__(self, "code", code)
+        object.__setattr__(self, "share_id", share_id)
+        object.__setattr__(self, "friendly_name", friendly_name)
+        object.__setattr__(self, "category", category)
+        object.__setattr__(self, "sorting_name", sorting_name)
+        object.__setattr__(self, "default_value", default_value)
+        object.__setattr__(self, "invert", invert)
+        object.__setattr__(self, "index", index)
 
-    @st.cache_data
-    def process(_self, code, default_value, invert):
-        """
-        Processes the data of a US Census table specified by the associated code argument.
+    def __setattr__(self, name, value):
+        raise AttributeError(f"SingleState objects are immutable, {name} cannot be set")
 
-        Args:
-            code (str): The specific code that identifies the table to take US Census data from
-            default_value (int): The default value that will be associated with the input on Streamlit
-            invert (bool): Indicates if the function is inverse or not
 
-        Returns:
-            DataFrame: A Pandas DataFrame with columns of state name, the original stat from the table, the ANSI code of each state, and the converted score after min-max scaling
-        """
-        response = requests.get(
-            f"https://api.census.gov/data/2023/acs/acs1/subject?get=NAME,{code}&for=state:*"
-        )
-        data = response.json()
-        data.pop(0)
-        data = [i for i in data if i[2] not in ["11", "72"]]
-        data = [[i[0], float(i[1]), int(i[2])] for i in data]
-        stat = [i[1] for i in data]
-        if invert:
-            stat = minmax_scale(stat, (default_value, 0))
-        else:
-            stat = minmax_scale(stat, (0, default_value))
-        for i in range(len(data)):
-            data[i].append(float(stat[i]))
-        data = pd.DataFrame(data, columns=["NAME", "stat", "code", "score"])
-        data.set_index("code", inplace=True)
-        data = data.sort_values(by=["score", "NAME"]).iloc[::-1]
-        return data
-
-    @st.cache_data
-    def msh():
+class MultiState:
+    def __init__(self, states: str, geography: str = "state"):
         """
-        Returns a template Pandas DataFrame with state names and ANSI codes, but zeroed stat and score columns.
+        Creates a MultiState object based on the weights contained within the states arg
 
-        Returns:
-            DataFrame: a template Pandas DataFrame with state names and ANSI codes, but zeroed stat and score columns.
+        Args:
+            states (str): The name of the array that holds the weight of every SingleState object
+            geography (str): "state" to score states or "county" to score counties
         """
-        response = requests.get(
-            "https://api.census.gov/data/2023/acs/acs1/subject?get=NAME,S1501_C02_015E&for=state:*"
-        )
-        data = response.json()
-        data.pop(0)
-        data = [i for i in data if i[2] not in ["11", "72"]]
-        data = [[i[0], float(0), int(i[2]), float(0)] for i in data]
-        data = pd.DataFrame(data, columns=["NAME", "stat", "code", "score"])
-        data.set_index("code", inplace=True)
-        data = data.sort_values(by=["score", "NAME"]).iloc[::-1]
-        return data
-
+        self.geography = geography
+        self.states = states
+        self.create_inputs(states)
 
-class MultiState:
-    def __init__(self, states: str, codeget: str):
+    @functools.cached_property
+    def df(self):
         """
-        Creates a MultiState object based on the SingleStates contained within the states arg
+        Scores every place on first use, so that results taken from the results cache never score
 
-        Args:
-            states (str): A dictionary that holds the invidual SingleState objects by their category names
-            codeget (str): The value of the code inputted in the text box on the Streamlit page
-            refresh_counter (int): A value that counts the number of times the Streamlit app has rerun
+        Returns:
+            DataFrame: The combined scores, as returned by process
         """
-        st.session_state[f"_{states}"] = dict(
-            sorted(st.session_state[f"_{states}"].items())
-        )
-        for p in st.session_state[f"_{states}"]:
-            st.session_state[f"_{states}"][p] = sorted(
-                st.session_state[f"_{states}"][p], key=lambda item: item.friendly_name
-            )
-        self.create_inputs(states)
-        if codeget != "":
-            count = 0
-            trans = listdecode(codeget)
-            for i in st.session_state[f"_{states}"].values():
-                for p in i:
-                    p.val = trans[count]
-                    count += 1
-        self.df = self.process(states)
+        return self.process(self.states)
 
     def create_inputs(_self, states):
+        weights = st.session_state[f"_{states}"]
         maxhelp = st.session_state["max_points_value"]
-        usedhelp = sum(
-            [
-                p.default_value
-                for i in st.session_state[f"_{states}"].values()
-                for p in i
-            ]
-        )
-        lefthelp = maxhelp - usedhelp
-        for p in st.session_state[f"_{states}"]:
-            st.sidebar.subheader(p)
+        lefthelp = maxhelp - int(weights.sum())
+        entries = indicators()
+        for p, codes in catalog.categories().items():
+            st.subheader(p)
 
             def change_number(i):
-                i.val = st.session_state[i.friendly_name]
+                st.session_state[states][i.index] = st.session_state[i.code]
 
-            for i in st.session_state[f"_{states}"][p]:
-                st.sidebar.number_input(
+            for code in codes:
+                i = entries[code]
+                val = int(weights[i.index])
+                st.number_input(
                     i.friendly_name,
                     0,
-                    i.default_value + lefthelp,
-                    i.default_value,
-                    key=i.friendly_name,
+                    max(val, val + lefthelp),
+                    val,
+                    key=i.code,
                     on_change=change_number,
                     args=[i],
                 )
-                i.val = st.session_state[i.friendly_name]
-                i.df = i.process(i.code, i.val, i.invert)
+                weights[i.index] = st.session_state[i.code]
+
+    @profiling.cached("MultiState.engine", st.cache_resource(ttl=census.TTL))
+    def engine(geography: str = "state", method: str = normalize.DEFAULT):
+        """
+        Maps the shared indicator matrix of a geography once per process and shares it between reruns and sessions. The matrix is a read-only file that every server process maps, so sessions only hold their weights. Other normalization methods are derived in memory from the engine of the default method
+
+        Args:
+            geography (str): "state" or "county"
+            method (str): The key of the normalization method in normalize.METHODS
+        Returns:
+            Engine: An Engine object holding the place names and the normalized stats of every indicator in the manifest
+        """
+        if method != normalize.DEFAULT:
+            return MultiState.engine(geography).normalized(method)
+        return matrix.engine(catalog.load(), geography)
+
+    @profiling.cached(
+        "MultiState.cube", st.cache_resource(ttl=census.TTL, validate=matrix.current)
+    )
+    def cube(geography: str = "state", method: str = normalize.DEFAULT):
+        """
+        Maps the shared cube of every year of a geography once per process and shares it between reruns and sessions, so moving through the years never reaches the API. A cube missing some years is mapped again once it expires, so the years come back after a failed fetch. Other normalization methods are derived in memory from the cube of the default method
+
+        Args:
+            geography (str): "state" or "county"
+            method (str): The key of the normalization method in normalize.METHODS
+        Returns:
+            Cube: A Cube object holding the place names and the normalized stats of every indicator in the manifest in every year
+        """
+        if method != normalize.DEFAULT:
+            return MultiState.cube(geography).normalized(method)
+        return matrix.cube(catalog.load(), geography)
 
     def process(self, states):
         """
-        Creates a DataFrame template and adds the score values of every SingleState object within the states arg
+        Scores every place with the values of every SingleState object within the states arg. The shared engine holds every indicator in the manifest, and only SingleStates with a non-zero value are scored.
 
         Returns:
             DataFrame: A Pandas DataFrame with the combined score values of the SingleStates within the states arg
         """
-        data = SingleState.msh()
-        for p in st.session_state[f"_{states}"].values():
-            for i in p:
-                data = data.merge(i.df[["NAME", "score"]], on="NAME")
-                data["score"] = data["score_x"] + data["score_y"]
-                data = data.drop(columns=["score_x", "score_y"])
-            data = data.sort_values(by=["score", "NAME"])
-        return data
+        weights = st.session_state[f"_{states}"]
+        values = {
+            code: int(weights[i.index])
+            for code, i in indicators().items()
+            if weights[i.index]
+        }
+        engine = MultiState.engine(self.geography, st.session_state["normalization"])
+        with profiling.span("MultiState.process"):
+            return engine.score(values)
+
+
+@profiling.cached("base_graph", st.cache_resource)
+def base_graph(cscale: str, geography: str = "state"):
+    """
+    Creates the map once per color scale and geography, with every place located but zeroed scores. County boundaries are served as a static file when Streamlit serves them
 
+    Args:
+        cscale (str): The color scale of the map
+        geography (str): "state" or "county"
+    Returns:
+        dict: The map as a Plotly figure dictionary, as made by maps.base
+    """
+    boundaries = None
+    if geography == "county" and st.get_option("server.enableStaticServing"):
+        boundaries = geo.published()
+    return maps.base(MultiState.engine(geography), cscale, geography, boundaries)
 
-def graph(state: MultiState):
+
+@st.cache_resource
+def results():
     """
-    Creates a map based on the values of the state arg
+    Creates the cache of rendered maps and tables once per process, shared by every session, so that popular share codes are drawn without scoring or building a figure
+
+    Returns:
+        LRU: An LRU object keyed by data, weights and display settings
+    """
+    return LRU("results")
+
+
+def render(state: MultiState, values: dict):
+    """
+    Builds the map and the table for the values of the state arg and the display settings, or takes them from the results cache. Weights are keyed as one number per indicator in manifest order, so every share code of the same weighting finds the same entry, and the data is keyed by the engine or cube itself, so entries are not reused once the data is refreshed
 
     Args:
-        states (MultiState): The MultiState object that the values of the graph will be derived from
+        state (MultiState): The MultiState object that the map and the table are derived from
+        values (dict): The weight of every code in the manifest
+    Returns:
+        tuple: The map as a Figure, the table as a DataFrame and the column config of the table
     """
-    us_state_to_abbrev = {
-        "Alabama": "AL",
-        "Alaska": "AK",
-        "Arizona": "AZ",
-        "Arkansas": "AR",
-        "California": "CA",
-        "Colorado": "CO",
-        "Connecticut": "CT",
-        "Delaware": "DE",
-        "Florida": "FL",
-        "Georgia": "GA",
-        "Hawaii": "HI",
-        "Idaho": "ID",
-        "Illinois": "IL",
-        "Indiana": "IN",
-        "Iowa": "IA",
-        "Kansas": "KS",
-        "Kentucky": "KY",
-        "Louisiana": "LA",
-        "Maine": "ME",
-        "Maryland": "MD",
-        "Massachusetts": "MA",
-        "Michigan": "MI",
-        "Minnesota": "MN",
-        "Mississippi": "MS",
-        "Missouri": "MO",
-        "Montana": "MT",
-        "Nebraska": "NE",
-        "Nevada": "NV",
-        "New Hampshire": "NH",
-        "New Jersey": "NJ",
-        "New Mexico": "NM",
-        "New York": "NY",
-        "North Carolina": "NC",
-        "North Dakota": "ND",
-        "Ohio": "OH",
-        "Oklahoma": "OK",
-        "Oregon": "OR",
-        "Pennsylvania": "PA",
-        "Rhode Island": "RI",
-        "South Carolina": "SC",
-        "South Dakota": "SD",
-        "Tennessee": "TN",
-        "Texas": "TX",
-        "Utah": "UT",
-        "Vermont": "VT",
-        "Virginia": "VA",
-        "Washington": "WA",
-        "West Virginia": "WV",
-        "Wisconsin": "WI",
-        "Wyoming": "WY",
-        "District of Columbia": "DC",
-        "American Samoa": "AS",
-        "Guam": "GU",
-        "Northern Mariana Islands": "MP",
-        "Puerto Rico": "PR",
-        "United States Minor Outlying Islands": "UM",
-        "Virgin Islands, U.S.": "VI",
-    }
-    df = state.df.reset_index()
-    df["state_code"] = df["NAME"].map(us_state_to_abbrev)
-    fig = px.choropleth(
-        df,
-        locations="state_code",
-        color="score",
-        locationmode="USA-states",
-        scope="usa",
-        hover_name="NAME",
-        hover_data={"score": True, "state_code": False},
-        color_continuous_scale=st.session_state["graph_cscale_value"],
+    cscale = st.session_state["graph_cscale_value"]
+    rounding = st.session_state["table_round_value"]
+    years = st.session_state["time_mode"]
+    method = st.session_state["normalization"]
+    data = (
+        MultiState.cube(state.geography, method)
+        if years
+        else MultiState.engine(state.geography, method)
     )
-    fig.update_layout(
-        geo=dict(bgcolor="#0e1117"),
+    key = (data, tuple(values.values()), cscale, rounding, years)
+    cache = results()
+    found = cache.get(key)
+    if found is not None:
+        return found
+    base = base_graph(cscale, state.geography)
+    if years:
+        fig, df, columns = timeline(base, state, values)
+    else:
+        with profiling.span("graph"):
+            fig = figure(base, state.df)
+        df = state.df
+        columns = {}
+    found = (
+        fig,
+        df,
+        {
+            "NAME": f"{state.geography.title()} Name",
+            "score": st.column_config.NumberColumn(
+                "Total Score", format=f"%.{rounding}f"
+            ),
+        }
+        | columns,
     )
-    st.plotly_chart(fig)
+    cache.put(key, found)
+    return found
 
 
-def minmax_scale(array: list, values: tuple):
+def animation(base: dict, cube, scores):
     """
-    Takes in a list, then returns a list with all of the objects within min max scaled
+    Copies the base map with one frame of scores per year, a slider to pick the year and a button to play through them. Every frame is sent with the map, so moving through the years happens in the browser without a rerun
 
     Args:
-        array (list): The list that is to be min max scaled
-        values (tuple): The range of the returned list
+        base (dict): The map made by base_graph
+        cube (Cube): The Cube object that scores was computed from
+        scores (ndarray): One row of total scores per year of cube, one column per place of cube
     Returns:
-        list: A min max scaled list based on the array arg
+        Figure: The map, showing the latest year
     """
-    mini = min(array)
-    maxi = max(array)
-    final = [
-        (values[0] + (((i - mini) * (values[1] - values[0])) / (maxi - mini)))
-        for i in array
-    ]
-    return final
+    trace = base["data"][0]
+    positions = pd.Index(cube.ansi).get_indexer(trace["ids"].astype(int))
+    z = scores[:, positions]
+    labels = [str(year) for year in cube.years]
+    animate = {"mode": "immediate", "transition": {"duration": 0}}
+    layout = base["layout"] | {
+        "coloraxis": base["layout"]["coloraxis"]
+        | {"cmin": np.nanmin(scores), "cmax": np.nanmax(scores)},
+        "sliders": [
+            {
+                "active": len(labels) - 1,
+                "currentvalue": {"prefix": "Year: "},
+                "steps": [
+                    {
+                        "label": label,
+                        "method": "animate",
+                        "args": [[label], animate | {"frame": {"redraw": True}}],
+                    }
+                    for label in labels
+                ],
+            }
+        ],
+        "updatemenus": [
+            {
+                "type": "buttons",
+                "showactive": False,
+                "buttons": [
+                    {
+                        "label": "Play",
+                        "method": "animate",
+                        "args": [
+                            labels,
+                            animate | {"frame": {"duration": 700, "redraw": True}},
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+    return go.Figure(
+        {
+            "data": [trace | {"z": z[-1]}],
+            "layout": layout,
+            "frames": [
+                {"name": label, "data": [{"type": trace["type"], "z": z[n]}]}
+                for n, label in enumerate(labels)
+            ],
+        },
+        _validate=False,
+    )
 
 
-def encode(num: str):
+def timeline(base: dict, state: MultiState, values: dict):
     """
-    Base36 encodes a number
+    Creates the animated map of every year and ranks every place in every year with the values of the state arg
 
     Args:
-        num (str): The number to be encoded
+        base (dict): The map made by base_graph
+        state (MultiState): The MultiState object whose geography is drawn
+        values (dict): The weight of each code
     Returns:
-        str: The encoded string
+        tuple: The map as a Figure, a Pandas DataFrame with columns of place name, the score of the latest year, the rank in every year and the change in rank from the first year to the latest, sorted by the latest rank, and the column config of the rank columns
     """
-    encoded = br(num, 36)
-    return encoded.zfill(2)
+    cube = MultiState.cube(state.geography, st.session_state["normalization"])
+    with profiling.span("timeline"):
+        scores = cube.score(values)
+        ranked = ranks(scores)
+        fig = animation(base, cube, scores)
+        df = pd.DataFrame(
+            {"NAME": cube.names, "score": scores[-1]}
+            | {str(year): ranked[n] for n, year in enumerate(cube.years)}
+            | {"change": ranked[0] - ranked[-1]}
+        )
+    columns = {
+        str(year): st.column_config.NumberColumn(f"Rank {year}") for year in cube.years
+    } | {
+        "change": st.column_config.NumberColumn(
+            f"Change since {cube.years[0]}", format="%+d"
+        )
+    }
+    return fig, df.sort_values(str(cube.years[-1]), kind="stable"), columns
 
 
-def decode(num: str):
+@profiling.cached(
+    "stability",
+    st.cache_data(ttl=census.TTL, show_spinner="Ranking sampled weightings"),
+)
+def stability(geography: str, codes: tuple, budget: int, method: str):
     """
-    Decodes a number from Base36
+    Measures how stable every rank is when the weights of codes change within the budget. Cached per indicator set, budget and normalization method, since the sampled weightings do not depend on the current weights
 
     Args:
-        num (str): The string to be decoded
+        geography (str): "state" or "county"
+        codes (tuple): The codes whose weights are sampled
+        budget (int): The most points a weighting may use
+        method (str): The key of the normalization method in normalize.METHODS
     Returns:
-        str: The decoded number
+        DataFrame: The rank distribution of every place, as returned by sensitivity.analyze
     """
-    return int(num, 36)
+    return sensitivity.analyze(
+        MultiState.engine(geography, method),
+        list(codes),
+        budget,
+        sensitivity.SAMPLES[geography],
+    )
 
 
-def listencode(array: list):
+def sensitivity_table(geography: str, values: dict):
     """
-    Encodes a series of numbers from a list into Base36
+    Shows how stable every rank is under other weightings of the indicators in use, or of every indicator if none is, in the current container
 
     Args:
-        array (list): The list holding the numbers to be encoded
+        geography (str): "state" or "county"
+        values (dict): The weight of each code
+    """
+    codes = tuple(code for code, value in values.items() if value) or tuple(values)
+    budget = st.session_state["max_points_value"]
+    st.write(
+        f"Ranks under {sensitivity.SAMPLES[geography]:,} random weightings of {len(codes)} indicators using at most {budget} points"
+    )
+    st.dataframe(
+        stability(geography, codes, budget, st.session_state["normalization"]),
+        hide_index=True,
+        column_config={
+            "NAME": f"{geography.title()} Name",
+            "best": "Best",
+            "p5": "5th percentile",
+            "median": "Median",
+            "p95": "95th percentile",
+            "worst": "Worst",
+            "mean": st.column_config.NumberColumn("Mean", format="%.1f"),
+            "top": st.column_config.ProgressColumn(
+                f"Top {sensitivity.TOP}", format="percent", min_value=0, max_value=1
+            ),
+        },
+        on_select="ignore",
+    )
+
+
+@st.cache_resource
+def indicators():
+    """
+    Creates a SingleState object for every indicator in the manifest once per process
+
     Returns:
-        str: A string containing the encoded numbers
+        dict: The SingleState objects keyed by their codes, in the order of the weights arrays
     """
-    final = ""
-    for i in array:
-        final += encode(i)
-    return final
+    return {
+        code: SingleState(**i, index=n)
+        for n, (code, i) in enumerate(catalog.load().items())
+    }
 
 
-def listdecode(code: str):
+def pack(values: dict):
     """
-    Decodes a series of numbers from a list out of Base36
+    Packs the weight of each indicator into a weights array
 
     Args:
-        code (str): The string to be decoded
+        values (dict): The weight of each code, zero for codes left out
     Returns:
-        list: A list of the decoded numbers
+        ndarray: The weight of every SingleState object, in the order of their index
+    """
+    return np.array(
+        [values.get(code, 0) for code in indicators()],
+        dtype=np.int32,
+    )
+
+
+def register(states: str):
     """
-    final = []
-    for i in range(0, len(code), 2):
-        final.append(decode(code[i : i + 2]))
-    return final
+    Creates the weights array of this session in the states arg with the default value of every indicator, unless it already matches the manifest
+
+    Args:
+        states (str): The name of the array that holds the weight of every SingleState object
+    """
+    if len(st.session_state[f"_{states}"]) != len(indicators()):
+        st.session_state[f"_{states}"] = pack(
+            {code: i.default_value for code, i in indicators().items()}
+        )
+
+
+def apply(states: str, code: str):
+    """
+    Sets the weights in the states arg from a share code, and resets their number inputs to the new values. Codes that use more points than the max points setting turn on its override and raise it to fit. Raises ValueError for the codes core.weights rejects, including codes using more than sharecode.MAX_POINTS, the highest max points the Settings page allows
+
+    Args:
+        states (str): The name of the array that holds the weight of every SingleState object
+        code (str): The share code, versioned or legacy
+    """
+    values = core.weights(code)
+    total = sum(values.values())
+    if total > st.session_state["max_points_value"]:
+        st.session_state["max_points_toggle"] = True
+        st.session_state["max_points_value"] = total
+        st.session_state["max_points_retention"] = total
+    st.session_state[f"_{states}"] = pack(values)
+    for i in indicators():
+        if i in st.session_state:
+            del st.session_state[i]
+
+
+def submit():
+    st.session_state.code_pending = st.session_state.code_input
 
 
 def main():
     st.session_state.refresh_counter += 1
     st.title("Main State Page")
     load_value("states")
+    register("states")
     with st.sidebar.form("code_form"):
-        codeget = st.text_input("If you have a code, put it here!")
-        submitted = st.form_submit_button("Apply", use_container_width=True)
-        if submitted:
-            st.rerun()
+        st.text_input("If you have a code, put it here!", key="code_input")
+        st.form_submit_button("Apply", use_container_width=True, on_click=submit)
+    if not st.session_state.code_linked:
+        st.session_state.code_linked = True
+        st.session_state.code_pending = st.query_params.get("code", "")
+    if st.session_state.code_pending:
+        try:
+            apply("states", st.session_state.code_pending)
+        except ValueError:
+            st.sidebar.error("That code is not valid")
+        st.session_state.code_pending = ""
+    store_value("states")
     max = st.sidebar.subheader("Max points: ")
     used = st.sidebar.subheader("Used points: ")
     left = st.sidebar.subheader("Points left: ")
-    SingleState(
-        "S1501_C02_014E",
-        "Percent of population 25+ with high school degree or higher",
-        "Education",
-        "high school degree",
-        0,
-        False,
-        "states",
-    )
-    SingleState(
-        "S1501_C02_015E",
-        "Percent of population 25+ with bachelor's degree or higher",
-        "Education",
-        "bachelor's degree",
-        0,
-        False,
-        "states",
-    )
-    SingleState(
-        "S1501_C02_013E",
-        "Percent of population 25+ with graduate degree or higher",
-        "Education",
-        "graduate degree",
-        0,
-        False,
-        "states",
-    )
-    SingleState(
-        "S2701_C05_001E",
-        "Percent of population without health insurance",
-        "Healthcare",
-        "health insurance",
-        0,
-        True,
-        "states",
-    )
-    SingleState(
-        "S1901_C01_012E",
-        "Median household income in the past 12 months",
-        "Economy",
-        "household income median",
-        0,
-        False,
-        "states",
-    )
-    SingleState(
-        "S1901_C01_013E",
-        "Mean household income in the past 12 months",
-        "Economy",
-        "household income mean",
-        0,
-        False,
-        "states",
-    )
-    SingleState(
-        "S2301_C04_001E",
-        "Unemployment rates for 16+",
-        "Economy",
-        "unemployment rates",
-        0,
-        True,
-        "states",
-    )
-    big = MultiState("states", codeget)
-    store_value("states")
-    st.sidebar.text(
-        f"Your current code is {listencode([p.val for i in st.session_state.states.values() for p in i])}"
-    )
-    maxhelp = st.session_state["max_points_value"]
-    usedhelp = sum([p.val for i in st.session_state["states"].values() for p in i])
-    max.subheader(f"Max points: {maxhelp}")
-    used.subheader(f"Used points: {usedhelp}")
-    left.subheader(f"Points left: {maxhelp - usedhelp}")
-    graph(big)
-    st.dataframe(
-        big.df,
-        hide_index=True,
-        column_order=["NAME", "score"],
-        column_config={
-            "NAME": "State Name",
-            "score": st.column_config.NumberColumn(
-                "Total Score", format=f"%.{st.session_state['table_round_value']}f"
-            ),
-        },
-        on_select="ignore",
+    chart = st.empty()
+    table = st.empty()
+    load_value("sensitivity_mode")
+    st.toggle(
+        "How stable are these ranks?",
+        key="_sensitivity_mode",
+        on_change=store_value,
+        args=["sensitivity_mode"],
     )
+    store_value("sensitivity_mode")
+    stable = st.empty()
+    with st.sidebar:
+        panel("states", [max, used, left], chart, table, stable)
+
+
+@st.fragment
+def panel(states: str, points: list, chart, table, stable):
+    """
+    Draws the number inputs in the current container and everything that depends on them. Changing a number input only reruns this function instead of the whole page
+
+    Args:
+        states (str): The name of the array that holds the weight of every SingleState object
+        points (list): The placeholders for the max, used and left points
+        chart: The placeholder that the map is drawn in
+        table: The placeholder that the table is drawn in
+        stable: The placeholder that the rank stability is drawn in
+    """
+    with profiling.span("panel"):
+        load_value(states)
+        geography = "county" if st.session_state["county_mode"] else "state"
+        big = MultiState(states, geography)
+        store_value(states)
+        weights = st.session_state[states]
+        values = {code: int(weights[i.index]) for code, i in indicators().items()}
+        code = core.share(values)
+        st.text(f"Your current code is {code}")
+        if not any(values.values()):
+            st.query_params.pop("code", None)
+        elif st.query_params.get("code") != code:
+            st.query_params["code"] = code
+        maxhelp = st.session_state["max_points_value"]
+        usedhelp = int(weights.sum())
+        points[0].subheader(f"Max points: {maxhelp}")
+        points[1].subheader(f"Used points: {usedhelp}")
+        points[2].subheader(f"Points left: {maxhelp - usedhelp}")
+        fig, df, columns = render(big, values)
+        with chart, profiling.span("st.plotly_chart"):
+            st.plotly_chart(fig)
+        with profiling.span("st.dataframe"):
+            table.dataframe(
+                df,
+                hide_index=True,
+                column_order=list(columns),
+                column_config=columns,
+                on_select="ignore",
+            )
+        if st.session_state["sensitivity_mode"]:
+            with stable.container():
+                sensitivity_table(geography, values)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import geo
+from scoring import Engine
+
+
+def base(engine: Engine, cscale: str, geography: str = "state", boundaries=None):
+    """
+    Creates the map with every place of engine located but zeroed scores. States are drawn from Plotly's built-in outlines and counties from boundaries, both matched by ANSI code rather than by name. Nothing here depends on Streamlit
+
+    Args:
+        engine (Engine): The Engine object whose places are drawn
+        cscale (str): The color scale of the map
+        geography (str): "state" or "county"
+        boundaries (dict | str): The county GeoJSON, or the URL the browser fetches it from, the cached county GeoJSON if left out
+    Returns:
+        dict: The map as a Plotly figure dictionary, with the ANSI code of every place in the ids of the trace
+    """
+    df = pd.DataFrame({"NAME": engine.names, "score": float(0), "ansi": engine.ansi})
+    if geography == "state":
+        df["location"] = df["ansi"].map(geo.STATES)
+        where = dict(locationmode="USA-states")
+    else:
+        df["location"] = df["ansi"].map("{:05d}".format)
+        if boundaries is None:
+            boundaries = geo.counties()
+        where = dict(geojson=boundaries, featureidkey="id")
+    fig = px.choropleth(
+        df,
+        locations="location",
+        color="score",
+        scope="usa",
+        hover_name="NAME",
+        hover_data={"score": True, "location": False},
+        color_continuous_scale=cscale,
+        **where,
+    )
+    fig.update_traces(ids=df["ansi"].astype(str))
+    if geography == "county":
+        fig.update_traces(marker_line_width=0)
+    fig.update_layout(
+        geo=dict(bgcolor="#0e1117"),
+    )
+    return fig.to_dict()
+
+
+def figure(base: dict, df):
+    """
+    Copies the base map with the scores of df swapped in, joined by ANSI code and skipping Plotly's validation since only the scores change
+
+    Args:
+        base (dict): The map made by base
+        df (DataFrame): A Pandas DataFrame with columns of ANSI code and score
+    Returns:
+        Figure: The map with the new scores
+    """
+    trace = base["data"][0]
+    score = df.set_index("ansi")["score"].reindex(trace["ids"].astype(int))
+    return go.Figure(
+        {"data": [trace | {"z": score.to_numpy()}], "layout": base["layout"]},
+        _validate=False,
+    )
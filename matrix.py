@@ -0,0 +1,324 @@
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+import census
+import normalize
+from scoring import Cube, Engine
+
+PATHS = {
+    geography: os.path.join(census.DATA_DIR, f"matrix-{geography}.json")
+    for geography in census.GEOGRAPHIES
+}
+CUBES = {
+    geography: os.path.join(census.DATA_DIR, f"cube-{geography}.json")
+    for geography in census.GEOGRAPHIES
+}
+RETRY = 15 * 60
+
+
+def save(array, meta: dict, path: str):
+    """
+    Writes an array to a new memory-mappable file, then points the index at it along with meta. Processes that mapped the previous file keep reading it until they remap
+
+    Args:
+        array (ndarray): The array to write
+        meta (dict): What describes the array, stored in the index
+        path (str): The path of the JSON index
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.basename(path).removesuffix(".json")
+    name = f"{prefix}-{uuid.uuid4().hex}.npy"
+    with open(os.path.join(directory, f"{name}.tmp"), "wb") as f:
+        np.save(f, array)
+    os.replace(os.path.join(directory, f"{name}.tmp"), os.path.join(directory, name))
+    previous = index(path)
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temporary, "w") as f:
+        json.dump({"file": name, "built": time.time()} | meta, f)
+    os.replace(temporary, path)
+    if previous and previous["file"] != name:
+        try:
+            os.remove(os.path.join(directory, previous["file"]))
+        except OSError:
+            pass
+
+
+def load(path: str):
+    """
+    Maps the array an index points at read-only, without copying it
+
+    Args:
+        path (str): The path of the JSON index
+    Returns:
+        tuple: The mapped array and the index, or None and None if nothing has been written
+    """
+    found = index(path)
+    if found is None:
+        return None, None
+    try:
+        array = np.load(
+            os.path.join(os.path.dirname(path) or ".", found["file"]), mmap_mode="r"
+        )
+    except OSError:
+        return None, None
+    return array, found
+
+
+def pack(stats: dict):
+    """
+    Turns the statistics of normalize.stats into lists for the JSON index, dropping the places axis
+
+    Args:
+        stats (dict): The statistics, as returned by normalize.stats
+    Returns:
+        dict: The same statistics as nested lists
+    """
+    return {name: np.squeeze(value, axis=-2).tolist() for name, value in stats.items()}
+
+
+def unpack(stats: dict):
+    """
+    Turns the statistics stored by pack back into the arrays that normalize works with
+
+    Args:
+        stats (dict): The statistics as stored in the JSON index
+    Returns:
+        dict: The statistics, as returned by normalize.stats
+    """
+    return {
+        name: np.expand_dims(np.array(value, dtype=float), axis=-2)
+        for name, value in stats.items()
+    }
+
+
+def write(engine: Engine, path: str = PATHS["state"]):
+    """
+    Writes an engine to the shared matrix in a column-major file, the columns normalized with normalize.DEFAULT first and then the raw stats, one of each per code. The statistics, which codes are inverse and the census.YEAR the stats are from go in the index, so the processes that map it can switch to any other method without going over the raw stats again
+
+    Args:
+        engine (Engine): The engine whose columns are written
+        path (str): The path of the JSON index
+    """
+    codes = list(engine.raw)
+    default = engine.normalized(normalize.DEFAULT)
+    matrix = np.empty((len(engine.names), 2 * len(codes)), order="F")
+    for i, code in enumerate(codes):
+        matrix[:, i] = default.columns[code]
+        matrix[:, len(codes) + i] = engine.raw[code]
+    save(
+        matrix,
+        {
+            "codes": codes,
+            "inverts": [engine.inverts[code] for code in codes],
+            "method": normalize.DEFAULT,
+            "stats": pack(engine.summary(codes)),
+            "year": census.YEAR,
+            "ansi": engine.ansi.tolist(),
+            "names": engine.names.tolist(),
+        },
+        path,
+    )
+
+
+def index(path: str = PATHS["state"]):
+    """
+    Reads the index of a shared array
+
+    Args:
+        path (str): The path of the JSON index
+    Returns:
+        dict: The file name and build time of the array and what describes it, or None if it has not been written
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def mapped(path: str = PATHS["state"]):
+    """
+    Maps the shared matrix read-only into an engine without copying it, so every process serving the app shares one copy of the normalized columns and raw stats in the page cache. Only other normalization methods, built with Engine.normalized, cost each process memory of its own
+
+    Args:
+        path (str): The path of the JSON index
+    Returns:
+        tuple: The Engine object using normalize.DEFAULT, whose columns and raw stats are views into the mapped file, and the index, or None and None if it has not been written or was written without its statistics
+    """
+    matrix, found = load(path)
+    if matrix is None or found.get("method") != normalize.DEFAULT:
+        return None, None
+    count = len(found["codes"])
+    engine = Engine(pd.Series(found["names"], index=found["ansi"]))
+    engine.extend(
+        found["codes"],
+        matrix[:, count:],
+        found["inverts"],
+        matrix[:, :count],
+        unpack(found["stats"]),
+    )
+    return engine, found
+
+
+def engine(entries: dict, geography: str = "state"):
+    """
+    Maps the shared matrix of a geography, building it first from the on-disk store if it is missing, lacks an indicator, flips another set of indicators than entries, holds another year than census.YEAR or is older than census.TTL. In offline mode an old matrix of census.YEAR is used as is
+
+    Args:
+        entries (dict): The manifest entries of every indicator to be scored, keyed by code
+        geography (str): "state" or "county"
+    Returns:
+        Engine: An Engine object with a normalized column for every code in entries
+    """
+    path = PATHS[geography]
+    found, meta = mapped(path)
+    if (
+        found is not None
+        and not found.missing(entries)
+        and [found.inverts[code] for code in entries]
+        == [bool(entries[code]["invert"]) for code in entries]
+        and meta.get("year") == census.YEAR
+        and (census.OFFLINE or time.time() - meta["built"] <= census.TTL)
+    ):
+        return found
+    codes = list(entries)
+    data = census.load(codes, geography)
+    fresh = Engine(data["NAME"])
+    fresh.add(data, {code: entries[code]["invert"] for code in codes})
+    write(fresh, path)
+    return mapped(path)[0] or fresh
+
+
+def frame(entries: dict, names, geography: str, year: int):
+    """
+    Loads the raw stats of one year of every indicator for the places in names
+
+    Args:
+        entries (dict): The manifest entries of every indicator, keyed by code
+        names (Series): The place names indexed by ANSI code
+        geography (str): "state" or "county"
+        year (int): The year of the release
+    Returns:
+        ndarray: One row per place in the order of Engine and one column per code, or None if the year could not be loaded
+    """
+    codes = list(entries)
+    try:
+        data = census.load(codes, geography, year)
+    except (requests.RequestException, LookupError):
+        return None
+    return data.reindex(Engine(names).ansi)[codes].to_numpy(dtype=float)
+
+
+def expires(found: dict):
+    """
+    Tells when a cube has to be built again. A cube missing some of the years it was built for only lasts RETRY, so years that failed to load for a passing reason are fetched again soon
+
+    Args:
+        found (dict): The index of the cube
+    Returns:
+        float: The time, census.TTL after the cube was built if it holds every requested year
+    """
+    complete = found["years"] == found["requested"]
+    return found["built"] + (census.TTL if complete else RETRY)
+
+
+def current(cube: Cube):
+    """
+    Tells if a cube returned by cube can still be used, for caches that hold it. In offline mode every cube can
+
+    Args:
+        cube (Cube): The Cube object
+    Returns:
+        bool: Whether the cube has not expired
+    """
+    return census.OFFLINE or cube.expires is None or time.time() < cube.expires
+
+
+def cube(entries: dict, geography: str = "state", years: list = None):
+    """
+    Maps the shared cube of every year of a geography, building it first if it is missing, does not match entries, years and the census.YEAR its places are from or has expired. The file holds the stats normalized with normalize.DEFAULT stacked on the raw stats, with the statistics of every year in the index, so the values of the cube stay views into it. Years are fetched side by side and years that cannot be loaded are left out until the cube expires. In offline mode an old cube is used as is
+
+    Args:
+        entries (dict): The manifest entries of every indicator to be scored, keyed by code
+        geography (str): "state" or "county"
+        years (list): The years to load, census.years() of geography if left out
+    Returns:
+        Cube: A Cube object using normalize.DEFAULT with a normalized column for every code in entries, one slice per year, with the places of census.YEAR
+    """
+    years = census.years(geography=geography) if years is None else list(years)
+    codes = list(entries)
+    inverts = [entries[code]["invert"] for code in codes]
+    path = CUBES[geography]
+    layers, found = load(path)
+    if (
+        layers is not None
+        and found["codes"] == codes
+        and found.get("inverts") == inverts
+        and found.get("method") == normalize.DEFAULT
+        and found["requested"] == years
+        and found.get("year") == census.YEAR
+        and (census.OFFLINE or time.time() < expires(found))
+    ):
+        return Cube(
+            pd.Series(found["names"], index=found["ansi"]),
+            found["years"],
+            codes,
+            layers[1],
+            inverts,
+            values=layers[0],
+            stats=unpack(found["stats"]),
+            expires=expires(found),
+        )
+    names = census.load([], geography)["NAME"]
+    with ThreadPoolExecutor(max_workers=min(census.WORKERS, len(years))) as pool:
+        frames = list(
+            pool.map(lambda year: frame(entries, names, geography, year), years)
+        )
+    kept = [year for year, values in zip(years, frames) if values is not None]
+    if not kept:
+        raise LookupError(f"None of the years {years} could be loaded")
+    order = Engine(names)
+    fresh = Cube(
+        pd.Series(order.names, index=order.ansi),
+        kept,
+        codes,
+        np.stack([values for values in frames if values is not None]),
+        inverts,
+        expires=expires({"built": time.time(), "years": kept, "requested": years}),
+    )
+    save(
+        np.stack([fresh.values, fresh.raw]),
+        {
+            "codes": codes,
+            "inverts": inverts,
+            "method": normalize.DEFAULT,
+            "stats": pack(fresh.stats),
+            "ansi": order.ansi.tolist(),
+            "names": order.names.tolist(),
+            "years": kept,
+            "requested": years,
+            "year": census.YEAR,
+        },
+        path,
+    )
+    layers, found = load(path)
+    if layers is None:
+        return fresh
+    return Cube(
+        pd.Series(found["names"], index=found["ansi"]),
+        kept,
+        codes,
+        layers[1],
+        inverts,
+        values=layers[0],
+        stats=unpack(found["stats"]),
+        expires=expires(found),
+    )
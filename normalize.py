@@ -0,0 +1,164 @@
+import warnings
+
+import numpy as np
+
+DEFAULT = "minmax"
+NAMES = {
+    "minmax": "Min-max",
+    "zscore": "Z-score",
+    "rank": "Percentile rank",
+    "robust": "Robust (median and IQR)",
+}
+CLIP = {"zscore": 3.0, "robust": 2.0}
+STATS = ["count", "min", "max", "mean", "std", "q1", "median", "q3"]
+
+
+def stats(array):
+    """
+    Computes the statistics of every column that the methods need, once, so switching methods never goes over the data again. Missing stats are ignored. The quartiles are read off one sort of every column at once. Places run along the second to last axis, so a stack of matrices gets statistics per matrix
+
+    Args:
+        array (ndarray): The raw stats, one row per place and one column per indicator
+    Returns:
+        dict: The count, min, max, mean, std, q1, median and q3 of every column, each an array with the places axis kept as length one
+    """
+    array = np.asarray(array, dtype=float)
+    ordered = np.sort(array, axis=-2)
+    count = np.sum(~np.isnan(array), axis=-2, keepdims=True)
+
+    def quantile(q: float):
+        position = np.maximum(count - 1, 0) * q
+        below = np.floor(position).astype(int)
+        above = np.ceil(position).astype(int)
+        low = np.take_along_axis(ordered, below, axis=-2)
+        high = np.take_along_axis(ordered, above, axis=-2)
+        return low + (position - below) * (high - low)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {
+            "count": count,
+            "min": quantile(0),
+            "max": quantile(1),
+            "mean": np.nanmean(array, axis=-2, keepdims=True),
+            "std": np.nanstd(array, axis=-2, keepdims=True),
+            "q1": quantile(0.25),
+            "median": quantile(0.5),
+            "q3": quantile(0.75),
+        }
+
+
+def divide(numerator, denominator, fill: float):
+    """
+    Divides without dividing by zero, filling fill where the denominator is not positive. Missing stats stay missing
+
+    Args:
+        numerator (ndarray): The values to divide
+        denominator (ndarray): The values to divide by, broadcast against numerator
+        fill (float): The result where the denominator is zero
+    Returns:
+        ndarray: The quotient
+    """
+    numerator, denominator = np.broadcast_arrays(numerator, denominator)
+    final = np.full(numerator.shape, fill, dtype=float)
+    np.divide(numerator, denominator, out=final, where=denominator > 0)
+    final[np.isnan(numerator)] = np.nan
+    return final
+
+
+def minmax(array, stats: dict):
+    """
+    Scales every column so its lowest stat is 0 and its highest is 1. Columns where every place has the same stat are 0.5
+
+    Args:
+        array (ndarray): The raw stats, one row per place and one column per indicator
+        stats (dict): The statistics of array, as returned by stats
+    Returns:
+        ndarray: The normalized stats
+    """
+    return divide(array - stats["min"], stats["max"] - stats["min"], 0.5)
+
+
+def zscore(array, stats: dict):
+    """
+    Scales every column by how many standard deviations each stat is from the mean, clipped to CLIP["zscore"] on both sides and mapped onto 0 to 1, so a single outlier does not squeeze the rest together. Columns where every place has the same stat are 0.5, even when rounding leaves them a tiny standard deviation
+
+    Args:
+        array (ndarray): The raw stats, one row per place and one column per indicator
+        stats (dict): The statistics of array, as returned by stats
+    Returns:
+        ndarray: The normalized stats, 0.5 at the mean
+    """
+    clip = CLIP["zscore"]
+    spread = np.where(stats["max"] > stats["min"], stats["std"], 0)
+    scores = divide(array - stats["mean"], spread, 0)
+    return np.clip(scores, -clip, clip) / (2 * clip) + 0.5
+
+
+def robust(array, stats: dict):
+    """
+    Scales every column by how many interquartile ranges each stat is from the median, clipped to CLIP["robust"] on both sides and mapped onto 0 to 1. Neither the center nor the spread moves with the extremes, which suits skewed indicators like income. Columns whose middle half all share one stat use the full range instead
+
+    Args:
+        array (ndarray): The raw stats, one row per place and one column per indicator
+        stats (dict): The statistics of array, as returned by stats
+    Returns:
+        ndarray: The normalized stats, 0.5 at the median
+    """
+    clip = CLIP["robust"]
+    spread = stats["q3"] - stats["q1"]
+    spread = np.where(spread > 0, spread, stats["max"] - stats["min"])
+    scores = divide(array - stats["median"], spread, 0)
+    return np.clip(scores, -clip, clip) / (2 * clip) + 0.5
+
+
+def rank(array, stats: dict):
+    """
+    Scales every column to the percentile rank of each stat, from 0 for the lowest to 1 for the highest, so only the order of the places counts. Tied places share the average of their ranks. Every column is ranked at once by sorting along the places axis
+
+    Args:
+        array (ndarray): The raw stats, one row per place and one column per indicator
+        stats (dict): The statistics of array, as returned by stats
+    Returns:
+        ndarray: The normalized stats
+    """
+    array = np.asarray(array, dtype=float)
+    places = array.shape[-2]
+    order = np.argsort(array, axis=-2, kind="stable")
+    ordered = np.take_along_axis(array, order, axis=-2)
+    positions = np.arange(places).reshape(places, 1)
+    first = np.ones(ordered.shape, dtype=bool)
+    first[..., 1:, :] = ordered[..., 1:, :] != ordered[..., :-1, :]
+    last = np.ones(ordered.shape, dtype=bool)
+    last[..., :-1, :] = first[..., 1:, :]
+    start = np.maximum.accumulate(np.where(first, positions, 0), axis=-2)
+    end = np.flip(
+        np.minimum.accumulate(
+            np.flip(np.where(last, positions, places), axis=-2), axis=-2
+        ),
+        axis=-2,
+    )
+    average = np.empty(array.shape)
+    np.put_along_axis(average, order, (start + end) / 2, axis=-2)
+    average[np.isnan(array)] = np.nan
+    return divide(average, stats["count"] - 1, 0.5)
+
+
+METHODS = {"minmax": minmax, "zscore": zscore, "rank": rank, "robust": robust}
+
+
+def apply(method: str, array, stats: dict, inverts):
+    """
+    Normalizes every column of array with one of the METHODS in a single vectorized pass, flipping the columns of inverse indicators so a higher result is always better
+
+    Args:
+        method (str): The key of the method in METHODS
+        array (ndarray): The raw stats, one row per place and one column per indicator
+        stats (dict): The statistics of array, as returned by stats
+        inverts (list): Indicates for every column if the function is inverse or not
+    Returns:
+        ndarray: The normalized stats, from 0 to 1
+    """
+    normalized = METHODS[method](np.asarray(array, dtype=float), stats)
+    inverts = np.asarray(inverts, dtype=bool)
+    return np.where(inverts, 1 - normalized, normalized)
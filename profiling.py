@@ -0,0 +1,248 @@
+import csv
+import functools
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+WINDOW = 1000
+
+enabled = os.environ.get("STATEPROJECT_PROFILE", "").lower() in ["1", "true", "yes"]
+spans = {}
+counters = {}
+lock = threading.Lock()
+
+
+class span:
+    def __init__(self, name: str):
+        """
+        Times the code run inside a with block and records it under name. Does nothing but a flag check while profiling is disabled
+
+        Args:
+            name (str): The name of the stage being timed
+        """
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter() if enabled else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            record(self.name, time.perf_counter() - self.start)
+
+
+def record(name: str, seconds: float):
+    """
+    Adds a timing to the rolling window of a stage
+
+    Args:
+        name (str): The name of the stage
+        seconds (float): How long the stage took
+    """
+    with lock:
+        if name not in spans:
+            spans[name] = deque(maxlen=WINDOW)
+        spans[name].append(seconds)
+
+
+def count(name: str, amount: int = 1):
+    """
+    Increases a counter while profiling is enabled
+
+    Args:
+        name (str): The name of the counter
+        amount (int): How much to add to it
+    """
+    if enabled:
+        with lock:
+            counters[name] = counters.get(name, 0) + amount
+
+
+def cached(name: str, decorator):
+    """
+    Wraps a function in a caching decorator such as st.cache_data, counting calls and misses and timing every call
+
+    Args:
+        name (str): The name that the timings and counters are recorded under
+        decorator (callable): The caching decorator
+    Returns:
+        callable: A decorator for the function to be cached
+    """
+
+    def wrap(func):
+        @functools.wraps(func)
+        def miss(*args, **kwargs):
+            count(f"{name} misses")
+            return func(*args, **kwargs)
+
+        cached_func = decorator(miss)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            if not enabled:
+                return cached_func(*args, **kwargs)
+            count(f"{name} calls")
+            with span(name):
+                return cached_func(*args, **kwargs)
+
+        call.clear = cached_func.clear
+        return call
+
+    return wrap
+
+
+def summary():
+    """
+    Summarizes the rolling window of every stage
+
+    Returns:
+        list: One dictionary per stage with its sample count and mean, p50, p95 and p99 in milliseconds
+    """
+    with lock:
+        windows = {name: np.array(times) for name, times in spans.items()}
+    rows = []
+    for name, times in sorted(windows.items()):
+        p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1000
+        rows.append(
+            {
+                "stage": name,
+                "samples": len(times),
+                "mean_ms": times.mean() * 1000,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+            }
+        )
+    return rows
+
+
+def caches():
+    """
+    Summarizes the counters of every function wrapped with cached
+
+    Returns:
+        list: One dictionary per function with its calls, hits, misses and hit rate
+    """
+    with lock:
+        snapshot = dict(counters)
+    rows = []
+    for key in sorted(snapshot):
+        if not key.endswith(" calls"):
+            continue
+        name = key.removesuffix(" calls")
+        calls = snapshot[key]
+        misses = snapshot.get(f"{name} misses", 0)
+        rows.append(
+            {
+                "function": name,
+                "calls": calls,
+                "hits": calls - misses,
+                "misses": misses,
+                "hit_rate": (calls - misses) / calls if calls else 0.0,
+            }
+        )
+    return rows
+
+
+def totals():
+    """
+    Lists every counter that does not belong to a function wrapped with cached, such as requests made, coalesced and throttled
+
+    Returns:
+        list: One dictionary per counter with its name and count
+    """
+    with lock:
+        snapshot = dict(counters)
+    return [
+        {"counter": name, "count": snapshot[name]}
+        for name in sorted(snapshot)
+        if not name.endswith((" calls", " misses"))
+    ]
+
+
+def sizeof(value, seen: set = None):
+    """
+    Estimates the memory held by a value and everything it refers to, counting shared objects once
+
+    Args:
+        value: The value to measure
+        seen (set): The ids of the objects already counted
+    Returns:
+        int: The size in bytes
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, np.ndarray):
+        return size if value.base is None else size + value.nbytes
+    if isinstance(value, dict):
+        size += sum(sizeof(k, seen) + sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sizeof(i, seen) for i in value)
+    if hasattr(value, "__dict__"):
+        size += sizeof(vars(value), seen)
+    return size
+
+
+def footprint(values):
+    """
+    Estimates the memory held by every entry of a mapping, such as the session state of one user
+
+    Args:
+        values (Mapping): The entries to measure
+    Returns:
+        list: One dictionary per key with the type and size in bytes of its value, largest first
+    """
+    seen = set()
+    rows = [
+        {"key": str(key), "type": type(value).__name__, "bytes": sizeof(value, seen)}
+        for key, value in values.items()
+    ]
+    return sorted(rows, key=lambda row: row["bytes"], reverse=True)
+
+
+def export_json():
+    """
+    Exports the stage summary, the cache summary and the raw counters
+
+    Returns:
+        str: A JSON document
+    """
+    with lock:
+        snapshot = dict(counters)
+    return json.dumps(
+        {"stages": summary(), "caches": caches(), "counters": snapshot}, indent=2
+    )
+
+
+def export_csv():
+    """
+    Exports the stage summary
+
+    Returns:
+        str: A CSV document with one row per stage
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, ["stage", "samples", "mean_ms", "p50_ms", "p95_ms", "p99_ms"]
+    )
+    writer.writeheader()
+    writer.writerows(summary())
+    return buffer.getvalue()
+
+
+def reset():
+    """
+    Forgets every recorded timing and counter
+    """
+    with lock:
+        spans.clear()
+        counters.clear()
@@ -1,13 +1,6 @@
 import os
 import sys
 
-import pandas  # noqa: F401
-import plotly.express  # noqa: F401
-import requests  # noqa: F401
-import streamlit
-import streamlit.runtime.scriptrunner.magic_funcs  # noqa: F401
-import streamlit.web.cli as stcli
-
 
 def resolve_path(path):
     resolved_path = os.path.abspath(os.path.join(os.getcwd(), path))
@@ -15,10 +8,17 @@ def resolve_path(path):
 
 
 if __name__ == "__main__":
+    import warmup
+
+    warmup.start(boot=True)
+
+    import streamlit.web.cli as stcli
+
     sys.argv = [
         "streamlit",
         "run",
         resolve_path("entrypoint.py"),
         "--global.developmentMode=false",
+        *sys.argv[1:],
     ]
     sys.exit(stcli.main())
@@ -0,0 +1,112 @@
+import argparse
+import sys
+
+import core
+import normalize
+
+CHUNK = 10000
+
+
+def read(path: str):
+    """
+    Reads share codes from a file, one per line, skipping blank lines
+
+    Args:
+        path (str): The path of the file, "-" for standard input
+    Returns:
+        list: The share codes
+    """
+    f = sys.stdin if path == "-" else open(path)
+    with f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def write(frames, output: str):
+    """
+    Streams ranked tables to a CSV or Parquet file
+
+    Args:
+        frames (iterable): The DataFrames to be written, all with the same columns
+        output (str): The path of the output file, "-" for CSV on standard output. Paths ending in .parquet are written as Parquet
+    """
+    if output.endswith(".parquet"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Writing Parquet needs pyarrow, install it or write a .csv file")
+        writer = None
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+        return
+    f = sys.stdout if output == "-" else open(output, "w", newline="")
+    with f:
+        header = True
+        for frame in frames:
+            frame.to_csv(f, index=False, header=header)
+            header = False
+
+
+def ranked(engine, codes: list, chunk: int = CHUNK, top: int = None):
+    """
+    Ranks the share codes chunk by chunk, reporting every invalid code on standard error as it is skipped
+
+    Args:
+        engine (Engine): The Engine object to score with
+        codes (list): The share codes
+        chunk (int): How many codes to score per pass
+        top (int): How many places to keep per code, every place if left out
+    Returns:
+        generator: One ranked DataFrame per chunk, as returned by core.rank_many
+    """
+    for i in range(0, len(codes), chunk):
+        frame = core.rank_many(engine, codes[i : i + chunk], top)
+        for code in frame.attrs["invalid"]:
+            print(f"Skipped {code}: not a valid share code", file=sys.stderr)
+        yield frame
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ranks the states for every share code in a file, without Streamlit"
+    )
+    parser.add_argument(
+        "codes", help='File with one share code per line, "-" for standard input'
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help='Output .csv or .parquet file, "-" for CSV on standard output',
+    )
+    parser.add_argument(
+        "--top", type=int, help="Only keep the top states of every code"
+    )
+    parser.add_argument(
+        "--geography",
+        choices=["state", "county"],
+        default="state",
+        help="Rank states or counties",
+    )
+    parser.add_argument(
+        "--normalization",
+        choices=list(normalize.METHODS),
+        default=normalize.DEFAULT,
+        help="How indicators are rescaled before scoring",
+    )
+    parser.add_argument(
+        "--chunk", type=int, default=CHUNK, help="How many codes to score per pass"
+    )
+    args = parser.parse_args()
+    codes = read(args.codes)
+    engine = core.load(geography=args.geography, method=args.normalization)
+    write(ranked(engine, codes, args.chunk, args.top), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+import normalize
+
+
+class Engine:
+    def __init__(self, names, method: str = normalize.DEFAULT):
+        """
+        Creates an Engine object holding normalized stats for every place, either states or counties, one column per indicator, with inverse functions already flipped. The raw stats and their statistics are kept alongside, so the normalization method can be switched without loading anything. Columns are added with add or extend
+
+        Args:
+            names (Series): A Pandas Series of place names indexed by the ANSI code of each place
+            method (str): The key of the normalization method in normalize.METHODS
+        """
+        names = names.sort_values()
+        self.names = names.to_numpy(dtype=object)
+        self.ansi = names.index.to_numpy()
+        self.method = method
+        self.raw = {}
+        self.inverts = {}
+        self.stats = {}
+        self.columns = {}
+
+    def missing(self, codes):
+        """
+        Lists the codes that have not been added yet
+
+        Args:
+            codes (iterable): The codes to check
+        Returns:
+            list: The codes in codes without a column
+        """
+        return [code for code in codes if code not in self.columns]
+
+    def add(self, data, inverts: dict):
+        """
+        Normalizes and stores a column for every code in data
+
+        Args:
+            data (DataFrame): A Pandas DataFrame indexed by the ANSI code of each place, with one column of stats per code
+            inverts (dict): Indicates for every code if the function is inverse or not
+        """
+        codes = [code for code in data.columns if code != "NAME"]
+        self.extend(
+            codes,
+            data.reindex(self.ansi)[codes].to_numpy(dtype=float),
+            [inverts[code] for code in codes],
+        )
+
+    def extend(self, codes: list, raw, inverts: list, matrix=None, found: dict = None):
+        """
+        Stores the raw stats of codes along with their statistics and normalized columns, computing whichever are not given in one pass. Given arrays are stored as they are, so columns of a mapped file stay views into it
+
+        Args:
+            codes (list): The code of every column of raw
+            raw (ndarray): The raw stats in the order of the places of this engine, one column per code
+            inverts (list): Indicates for every code if the function is inverse or not
+            matrix (ndarray): The stats already normalized with the method of this engine, in the layout of raw
+            found (dict): The statistics of raw, as returned by normalize.stats
+        """
+        if found is None:
+            found = normalize.stats(raw)
+        if matrix is None:
+            matrix = normalize.apply(self.method, raw, found, inverts)
+        for i, code in enumerate(codes):
+            self.raw[code] = raw[:, i]
+            self.inverts[code] = bool(inverts[i])
+            self.stats[code] = {
+                name: float(value[0, i]) for name, value in found.items()
+            }
+            self.columns[code] = matrix[:, i]
+
+    def summary(self, codes: list):
+        """
+        Gathers the statistics of codes into the arrays that normalize works with
+
+        Args:
+            codes (list): The codes, every one of them must have been added
+        Returns:
+            dict: The statistics, as returned by normalize.stats for the columns of codes
+        """
+        return {
+            name: np.array([[self.stats[code][name] for code in codes]])
+            for name in normalize.STATS
+        }
+
+    def normalized(self, method: str):
+        """
+        Creates an engine with the same places and raw stats, normalized with another method in one pass over every column. Nothing is loaded and the statistics are not computed again, but the new columns are arrays of this process rather than views of a shared file
+
+        Args:
+            method (str): The key of the normalization method in normalize.METHODS
+        Returns:
+            Engine: The new Engine object, or this one if it already uses method
+        """
+        if method == self.method:
+            return self
+        engine = copy.copy(self)
+        engine.method = method
+        engine.raw = dict(self.raw)
+        engine.inverts = dict(self.inverts)
+        engine.stats = dict(self.stats)
+        codes = list(self.raw)
+        if not codes:
+            engine.columns = {}
+            return engine
+        matrix = normalize.apply(
+            method,
+            np.column_stack([self.raw[code] for code in codes]),
+            self.summary(codes),
+            [self.inverts[code] for code in codes],
+        )
+        engine.columns = {code: matrix[:, i] for i, code in enumerate(codes)}
+        return engine
+
+    def score(self, values: dict):
+        """
+        Scores every place with one matrix-vector product over the columns with a non-zero weight
+
+        Args:
+            values (dict): The weight of each code, every code with a non-zero weight must have been added
+        Returns:
+            DataFrame: A Pandas DataFrame with columns of place name, a zeroed stat, the total score and the ANSI code, sorted by score and then by name
+        """
+        values = {code: value for code, value in values.items() if value}
+        matrix = np.zeros((len(self.names), len(values)))
+        for i, code in enumerate(values):
+            matrix[:, i] = self.columns[code]
+        total = matrix @ np.fromiter(values.values(), dtype=float, count=len(values))
+        order = np.argsort(total, kind="stable")
+        return pd.DataFrame(
+            {
+                "NAME": self.names[order],
+                "stat": np.zeros(len(order)),
+                "score": total[order],
+                "ansi": self.ansi[order],
+            }
+        )
+
+
+class Cube:
+    def __init__(
+        self,
+        names,
+        years: list,
+        codes: list,
+        raw,
+        inverts: list = None,
+        method: str = normalize.DEFAULT,
+        values=None,
+        stats: dict = None,
+        expires: float = None,
+    ):
+        """
+        Creates a Cube object holding the normalized stats of every place in every year, normalized within each year the same way as Engine. The statistics of every year are kept, so the normalization method can be switched without loading anything
+
+        Args:
+            names (Series): A Pandas Series of place names indexed by the ANSI code of each place, in the order of the places in raw
+            years (list): The year of each slice of raw
+            codes (list): The code of each column of raw
+            raw (ndarray): The raw stats, one slice per year, one row per place and one column per code, missing where a place has no stats in a year
+            inverts (list): Indicates for every code if the function is inverse or not, none are if left out
+            method (str): The key of the normalization method in normalize.METHODS
+            values (ndarray): The stats already normalized with method, in the layout of raw, which are stored as they are so a mapped file stays shared. Computed from raw if left out
+            stats (dict): The statistics of every year of raw, as returned by normalize.stats, computed if left out
+            expires (float): The time after which the cube should be built again, never if left out
+        """
+        self.names = names.to_numpy(dtype=object)
+        self.ansi = names.index.to_numpy()
+        self.years = list(years)
+        self.codes = list(codes)
+        self.raw = raw
+        self.inverts = [False] * len(self.codes) if inverts is None else list(inverts)
+        self.stats = normalize.stats(raw) if stats is None else stats
+        self.method = method
+        self.values = (
+            normalize.apply(method, raw, self.stats, self.inverts)
+            if values is None
+            else values
+        )
+        self.expires = expires
+
+    def normalized(self, method: str):
+        """
+        Creates a cube with the same places, years and raw stats, normalized with another method. Nothing is loaded and the statistics are not computed again, but the new values are an array of this process rather than a view of a shared file
+
+        Args:
+            method (str): The key of the normalization method in normalize.METHODS
+        Returns:
+            Cube: The new Cube object, or this one if it already uses method
+        """
+        if method == self.method:
+            return self
+        cube = copy.copy(self)
+        cube.method = method
+        cube.values = normalize.apply(method, self.raw, self.stats, self.inverts)
+        return cube
+
+    def score(self, values: dict):
+        """
+        Scores every place in every year with one product over the columns with a non-zero weight, so that switching years is only a slice of the result
+
+        Args:
+            values (dict): The weight of each code
+        Returns:
+            ndarray: A NumPy array with one row of total scores per year, one column per place
+        """
+        weights = np.array([values.get(code, 0) for code in self.codes], dtype=float)
+        used = np.flatnonzero(weights)
+        return self.values[:, :, used] @ weights[used]
+
+
+def ranks(scores):
+    """
+    Ranks the places in every row of scores, from 1 for the highest score. Ties keep the order of the places and places without a score come last
+
+    Args:
+        scores (ndarray): One row of total scores per year, one column per place
+    Returns:
+        ndarray: The rank of every place in every year
+    """
+    scores = np.atleast_2d(scores)
+    order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), axis=1, kind="stable")
+    ranked = np.empty_like(order)
+    np.put_along_axis(
+        ranked, order, np.broadcast_to(np.arange(1, order.shape[1] + 1), order.shape), 1
+    )
+    return ranked
+
+
+def minmax_scale(array, values: tuple):
+    """
+    Takes in an array, then returns an array with all of the objects within min max scaled. Two-dimensional arrays are scaled column by column, missing stats are ignored and stay missing, and columns where every stat is the same land in the middle of the range
+
+    Args:
+        array (list): The list or array that is to be min max scaled
+        values (tuple): The range of the returned array
+    Returns:
+        ndarray: A min max scaled array based on the array arg
+    """
+    array = np.asarray(array, dtype=float)
+    mini = np.nanmin(array, axis=0)
+    maxi = np.nanmax(array, axis=0)
+    scaled = normalize.divide(array - mini, maxi - mini, 0.5)
+    return values[0] + scaled * (values[1] - values[0])
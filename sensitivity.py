@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scoring import Engine
+
+SAMPLES = {"state": 100000, "county": 10000}
+CELLS = 2_000_000
+TOP = 10
+WORKERS = int(os.environ.get("STATEPROJECT_SENSITIVITY_WORKERS", os.cpu_count() or 1))
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def pool():
+    """
+    Starts the shared process pool the first time it is needed. Its processes are spawned rather than forked, since the server that calls it runs many threads
+
+    Returns:
+        ProcessPoolExecutor: The process pool, shared by every session on this server
+    """
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return executor
+
+
+def sample(rng: np.random.Generator, count: int, size: int, budget: int):
+    """
+    Draws weight vectors evenly from every way of spending at most budget points, by splitting the budget between the indicators and the points left unspent and rounding down. Vectors that round down to no points at all would rank every place by name, so they are drawn again
+
+    Args:
+        rng (Generator): The source of randomness
+        count (int): The amount of indicators
+        size (int): The amount of weight vectors
+        budget (int): The most points a weight vector may use, at least one is used
+    Returns:
+        ndarray: One row of integer weights per vector, one column per indicator, none of them all zero
+    """
+    budget = max(budget, 1)
+    weights = np.floor(rng.dirichlet(np.ones(count + 1), size)[:, :count] * budget)
+    empty = np.flatnonzero(~weights.any(axis=1))
+    while len(empty):
+        shares = rng.dirichlet(np.ones(count + 1), len(empty))[:, :count]
+        weights[empty] = np.floor(shares * budget)
+        empty = empty[~weights[empty].any(axis=1)]
+    return weights
+
+
+def histogram(columns, budget: int, size: int, seed):
+    """
+    Scores and ranks size sampled weight vectors in one vectorized pass and counts how often every place lands on every rank
+
+    Args:
+        columns (ndarray): The normalized stats, one row per place and one column per indicator
+        budget (int): The most points a weight vector may use
+        size (int): The amount of weight vectors
+        seed (SeedSequence): The seed of this batch
+    Returns:
+        ndarray: The amount of vectors that put each place, by row, on each rank, by column, from the highest score
+    """
+    places = columns.shape[0]
+    weights = sample(np.random.default_rng(seed), columns.shape[1], size, budget)
+    order = np.argsort(-(weights @ columns.T), axis=1, kind="stable")
+    cells = order * places + np.arange(places)
+    return np.bincount(cells.ravel(), minlength=places * places).reshape(places, places)
+
+
+def analyze(
+    engine: Engine,
+    codes: list,
+    budget: int,
+    samples: int = SAMPLES["state"],
+    top: int = TOP,
+    seed: int = 0,
+):
+    """
+    Measures how stable the rank of every place is when the weights of codes change, by ranking the places for many weight vectors sampled within the budget. Batches are sized so that each one ranks about CELLS places in total, which bounds their memory, and are spread across the shared process pool. The same arguments always give the same result
+
+    Args:
+        engine (Engine): The Engine object to score with, holding a column for every code
+        codes (list): The codes whose weights are sampled, every other weight is zero
+        budget (int): The most points a weight vector may use, as in the max points setting
+        samples (int): The amount of weight vectors
+        top (int): The rank that counts as the top
+        seed (int): The seed of the sampled weights
+    Returns:
+        DataFrame: A Pandas DataFrame with columns of place name, best, 5th percentile, median, 95th percentile and worst rank, mean rank and the share of weightings that put the place in the top ranks, sorted by median and mean rank
+    """
+    columns = np.column_stack([engine.columns[code] for code in codes])
+    columns = np.nan_to_num(columns)
+    chunk = max(CELLS // columns.shape[0], 1)
+    sizes = [min(chunk, samples - i) for i in range(0, samples, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    arguments = ([columns] * len(sizes), [budget] * len(sizes), sizes, seeds)
+    if WORKERS > 1 and len(sizes) > 1:
+        counts = sum(pool().map(histogram, *arguments))
+    else:
+        counts = sum(map(histogram, *arguments))
+    ranks = np.arange(1, counts.shape[1] + 1)
+    cumulative = np.cumsum(counts, axis=1) / samples
+    quantiles = {
+        name: (cumulative < q).sum(axis=1) + 1
+        for name, q in [("p5", 0.05), ("median", 0.5), ("p95", 0.95)]
+    }
+    seen = counts > 0
+    data = pd.DataFrame(
+        {
+            "NAME": engine.names,
+            "best": seen.argmax(axis=1) + 1,
+            **quantiles,
+            "worst": counts.shape[1] - seen[:, ::-1].argmax(axis=1),
+            "mean": counts @ ranks / samples,
+            "top": counts[:, :top].sum(axis=1) / samples,
+        }
+    )
+    return data.sort_values(["median", "mean"], kind="stable", ignore_index=True)
@@ -1,6 +1,10 @@
 import plotly.express as px
 import streamlit as st
 
+import normalize
+import profiling
+import warmup
+from sharecode import MAX_POINTS
 from storeandload import load_value, store_value
 
 
@@ -9,6 +13,96 @@ def dual_value(key: str, key2: str):
     store_value(key2)
 
 
+def switch(key: str, text: str):
+    load_value(key)
+    st.toggle(
+        text,
+        key=f"_{key}",
+        on_change=store_value,
+        args=[key],
+    )
+    store_value(key)
+
+
+def choice(key: str, text: str, options: dict):
+    load_value(key)
+    st.selectbox(
+        text,
+        list(options),
+        format_func=options.get,
+        key=f"_{key}",
+        on_change=store_value,
+        args=[key],
+    )
+    store_value(key)
+
+
+def memory():
+    st.subheader("Session memory")
+    rows = profiling.footprint(st.session_state)
+    st.write(
+        f"This session keeps about {sum(row['bytes'] for row in rows) / 1024:.1f} KiB in its session state"
+    )
+    with st.expander("Memory by key"):
+        st.dataframe(rows, hide_index=True)
+
+
+def record():
+    profiling.enabled = st.session_state["profiling_toggle"]
+
+
+def diagnostics():
+    st.subheader("Diagnostics")
+    st.write(warmup.describe())
+    st.session_state["profiling_toggle"] = profiling.enabled
+    st.toggle(
+        "Record timings of every rerun",
+        key="profiling_toggle",
+        on_change=record,
+    )
+    if not profiling.enabled:
+        return
+    st.write("Rolling timings of each stage, shared by every session on this server")
+    st.dataframe(
+        profiling.summary(),
+        hide_index=True,
+        column_config={
+            "mean_ms": st.column_config.NumberColumn("mean (ms)", format="%.2f"),
+            "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.2f"),
+            "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.2f"),
+            "p99_ms": st.column_config.NumberColumn("p99 (ms)", format="%.2f"),
+        },
+    )
+    st.write("Cache hits and misses")
+    st.dataframe(
+        profiling.caches(),
+        hide_index=True,
+        column_config={
+            "hit_rate": st.column_config.NumberColumn("hit rate", format="%.2f")
+        },
+    )
+    st.write("Counters")
+    st.dataframe(profiling.totals(), hide_index=True)
+    json_col, csv_col, reset_col = st.columns(3)
+    json_col.download_button(
+        "Export JSON",
+        profiling.export_json(),
+        "timings.json",
+        "application/json",
+        use_container_width=True,
+    )
+    csv_col.download_button(
+        "Export CSV",
+        profiling.export_csv(),
+        "timings.csv",
+        "text/csv",
+        use_container_width=True,
+    )
+    if reset_col.button("Reset", use_container_width=True):
+        profiling.reset()
+        st.rerun()
+
+
 def gdbint(
     key1: str,
     key2: str,
@@ -23,9 +117,7 @@ def gdbint(
     load_value(key2)
     load_value(key3)
     if key1 == "max_points_toggle":
-        currentuse = sum(
-            [p.default_value for i in st.session_state["_states"].values() for p in i]
-        )
+        currentuse = int(st.session_state["states"].sum())
         disable = currentuse <= default
         disable = st.session_state.get(f"_{key1}", False) and not disable
     else:
@@ -101,8 +193,8 @@ gdbint(
     "max_points_retention",
     "Override max points",
     "New max points",
-    sum([p.default_value for i in st.session_state["_states"].values() for p in i]),
-    1000,
+    int(st.session_state["states"].sum()),
+    MAX_POINTS,
     100,
 )
 gdbint(
@@ -123,3 +215,8 @@ gdbstr(
     'New color scale ("None" for no rounding)',
     "reds",
 )
+switch("county_mode", "Score counties instead of states")
+switch("time_mode", "Show every year with a year slider and rank changes")
+choice("normalization", "How indicators are rescaled before scoring", normalize.NAMES)
+memory()
+diagnostics()
@@ -0,0 +1,238 @@
+import zlib
+
+import numpy as np
+from numpy import base_repr as br
+
+ALPHABET = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITS = np.full(256, -1)
+DIGITS[np.frombuffer(ALPHABET, np.uint8)] = np.arange(36)
+DIGITS[np.frombuffer(ALPHABET.lower(), np.uint8)] = np.arange(36)
+VALUES = DIGITS.tolist()
+VERSION = "1"
+MAX_POINTS = 1000
+
+
+def encode(num: str):
+    """
+    Base36 encodes a number
+
+    Args:
+        num (str): The number to be encoded
+    Returns:
+        str: The encoded string
+    """
+    encoded = br(num, 36)
+    return encoded.zfill(2)
+
+
+def decode(num: str):
+    """
+    Decodes a number from Base36
+
+    Args:
+        num (str): The string to be decoded
+    Returns:
+        str: The decoded number
+    """
+    return int(num, 36)
+
+
+def listencode(array: list):
+    """
+    Encodes a series of numbers from a list into Base36
+
+    Args:
+        array (list): The list holding the numbers to be encoded
+    Returns:
+        str: A string containing the encoded numbers
+    """
+    final = ""
+    for i in array:
+        final += encode(i)
+    return final
+
+
+def listdecode(code: str):
+    """
+    Decodes a series of numbers from a list out of Base36
+
+    Args:
+        code (str): The string to be decoded
+    Returns:
+        list: A list of the decoded numbers
+    """
+    final = []
+    for i in range(0, len(code), 2):
+        final.append(decode(code[i : i + 2]))
+    return final
+
+
+def pack(num: int):
+    """
+    Encodes a non-negative number into a variable amount of Base36 characters. Every character carries 18 values, characters from I to Z mean that more characters follow
+
+    Args:
+        num (int): The number to be encoded
+    Returns:
+        str: The encoded string
+    """
+    if num < 0:
+        raise ValueError(f"{num} is negative and cannot be put in a code")
+    digits = [num % 18]
+    num //= 18
+    while num:
+        digits.append(num % 18 + 18)
+        num //= 18
+    return bytes(ALPHABET[i] for i in reversed(digits)).decode()
+
+
+def unpack(code: str):
+    """
+    Decodes every number packed into a string with pack. A number may not start with a continuation character of value 0, which pack never writes, so every list of numbers has exactly one packed string
+
+    Args:
+        code (str): The string to be decoded
+    Returns:
+        list: A list of the decoded numbers
+    """
+    final = []
+    num = 0
+    for i in code.encode():
+        digit = VALUES[i]
+        if digit < 0:
+            raise ValueError(f"{chr(i)} is not a Base36 character")
+        if digit == 18 and not num:
+            raise ValueError(f"{code} has a number with a leading zero")
+        num = num * 18 + digit % 18
+        if digit < 18:
+            final.append(int(num))
+            num = 0
+    if num:
+        raise ValueError(f"{code} ends in the middle of a number")
+    return final
+
+
+def checksum(body: str):
+    """
+    Computes the two character checksum of a code
+
+    Args:
+        body (str): The code without its checksum
+    Returns:
+        str: Two Base36 characters
+    """
+    return encode(zlib.crc32(body.upper().encode()) % 36**2)
+
+
+def encode_weights(weights: dict):
+    """
+    Encodes weights into a versioned code. Only non-zero weights are written, each one after the distance from the previous share id, so codes stay short and do not change when indicators are added
+
+    Args:
+        weights (dict): The weight of each share id
+    Returns:
+        str: The code, made of the version, a dot, the packed weights and a checksum
+    """
+    body = f"{VERSION}."
+    last = -1
+    for i in sorted(weights):
+        if weights[i]:
+            body += pack(i - last - 1) + pack(int(weights[i]))
+            last = i
+    return body + checksum(body)
+
+
+def decode_weights(code: str):
+    """
+    Decodes a code made by encode_weights, or a legacy code made by listencode whose positions are share ids
+
+    Args:
+        code (str): The code to be decoded
+    Returns:
+        dict: The weight of each share id found in the code
+    """
+    code = code.strip()
+    if "." not in code:
+        if len(code) % 2 or not (code.isascii() and code.isalnum()):
+            raise ValueError(f"{code} is not a valid code")
+        return dict(enumerate(listdecode(code)))
+    version, _, rest = code.partition(".")
+    if version != VERSION:
+        raise ValueError(f"{code} was made by an unknown version of the code format")
+    body, check = code[:-2], code[-2:]
+    if len(rest) < 2 or checksum(body).upper() != check.upper():
+        raise ValueError(f"{code} has a wrong checksum")
+    nums = unpack(rest[:-2])
+    if len(nums) % 2:
+        raise ValueError(f"{code} ends in the middle of a weight")
+    final = {}
+    last = -1
+    for gap, weight in zip(nums[0::2], nums[1::2]):
+        last += gap + 1
+        final[last] = weight
+    return final
+
+
+def encode_many(matrix, ids: list):
+    """
+    Encodes many rows of weights at once
+
+    Args:
+        matrix (ndarray): One row of weights per code, one column per share id
+        ids (list): The share id of every column
+    Returns:
+        list: One code per row
+    """
+    return [encode_weights(dict(zip(ids, row))) for row in np.asarray(matrix).tolist()]
+
+
+def decode_many(codes: list, ids: list):
+    """
+    Decodes many codes at once. Legacy codes are decoded together as one array, versioned codes one at a time. A code is valid here exactly when decode_weights accepts it and it uses at most MAX_POINTS points, which keeps every weight within the array
+
+    Args:
+        codes (list): The strings to be decoded
+        ids (list): The share ids to make columns for, weights of other share ids are dropped
+    Returns:
+        ndarray: A NumPy array with one row of weights per code and one column per share id. Rows of invalid codes are filled with -1
+    """
+    codes = [i.strip() for i in codes]
+    columns = {i: n for n, i in enumerate(ids)}
+    final = np.zeros((len(codes), len(ids)), dtype=np.int64)
+    legacy = [n for n, i in enumerate(codes) if "." not in i]
+    if legacy:
+        valid = np.array(
+            [
+                len(codes[n]) % 2 == 0 and codes[n].isascii() and codes[n].isalnum()
+                for n in legacy
+            ],
+            dtype=bool,
+        )
+        width = max(
+            [2 * (max(columns, default=-1) + 1)]
+            + [len(codes[n]) for n, ok in zip(legacy, valid) if ok]
+        )
+        chars = np.array(
+            [codes[n].ljust(width, "0") if ok else "" for n, ok in zip(legacy, valid)],
+            dtype=f"S{max(width, 1)}",
+        )
+        digits = DIGITS[chars.view(np.uint8).reshape(len(legacy), -1)[:, :width]]
+        decoded = digits[:, 0::2] * 36 + digits[:, 1::2]
+        decoded[~valid | (digits < 0).any(axis=1)] = -1
+        decoded[decoded.sum(axis=1) > MAX_POINTS] = -1
+        final[legacy] = decoded[:, list(columns)]
+    for n, i in enumerate(codes):
+        if "." not in i:
+            continue
+        try:
+            weights = decode_weights(i)
+        except ValueError:
+            final[n] = -1
+            continue
+        if sum(weights.values()) > MAX_POINTS:
+            final[n] = -1
+            continue
+        for share_id, weight in weights.items():
+            if share_id in columns:
+                final[n, columns[share_id]] = weight
+    return final
@@ -0,0 +1,151 @@
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+READY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "ready.json")
+GEOGRAPHIES = os.environ.get("STATEPROJECT_WARMUP", "state")
+
+status = {"ready": False, "stage": "waiting", "seconds": None, "errors": []}
+lock = threading.Lock()
+started = threading.Event()
+ready = threading.Event()
+
+
+def start(boot: bool = False):
+    """
+    Starts the warm-up on a daemon thread, once per process. Calling it again does nothing, so both run.py at boot and every new session may call it. Only run.py starts it while the server boots, under a plain streamlit run the first session does
+
+    Args:
+        boot (bool): Whether Streamlit is still starting in this process, in which case the thread waits for its runtime to be up before importing anything, since two threads importing the same modules at once can see them half initialized
+    """
+    with lock:
+        if started.is_set():
+            return
+        started.set()
+    try:
+        os.remove(READY)
+    except OSError:
+        pass
+    threading.Thread(target=run, args=[boot], name="warmup", daemon=True).start()
+
+
+def serving():
+    """
+    Checks if the Streamlit runtime of this process has started, without importing it
+
+    Returns:
+        bool: Whether the runtime accepts sessions
+    """
+    runtime = getattr(sys.modules.get("streamlit.runtime.runtime"), "Runtime", None)
+    if runtime is None or not runtime.exists():
+        return False
+    return runtime.instance().state.name != "INITIAL"
+
+
+def stage(name: str, func):
+    """
+    Runs one stage of the warm-up, recording its name while it runs and its error if it fails, so that a failing stage never keeps the server from becoming ready
+
+    Args:
+        name (str): The name of the stage
+        func (callable): What the stage does
+    """
+    status["stage"] = name
+    try:
+        func()
+    except Exception as e:
+        status["errors"].append(f"{name}: {e!r}")
+        traceback.print_exc()
+
+
+def run(boot: bool = False):
+    """
+    Imports what the pages need and fills the caches that live outside Streamlit before the first session gets past entrypoint.py: the indicator manifest, the Census data in the on-disk store, the shared indicator matrix of every geography in STATEPROJECT_WARMUP and Plotly's map templates. Writes READY when done, which Streamlit serves at app/static/ready.json for readiness probes
+
+    Args:
+        boot (bool): Whether to wait for the Streamlit runtime to be up first
+    """
+    while boot and not serving():
+        time.sleep(0.05)
+    begin = time.perf_counter()
+
+    def imports():
+        import numpy  # noqa: F401
+        import pandas  # noqa: F401
+        import plotly.express  # noqa: F401
+        import plotly.graph_objects  # noqa: F401
+        import requests  # noqa: F401
+        import streamlit.runtime.scriptrunner.magic_funcs  # noqa: F401
+
+    def data(geography: str):
+        import catalog
+        import matrix
+
+        matrix.engine(catalog.load(), geography)
+        if geography == "county":
+            import geo
+
+            geo.published()
+
+    def template():
+        import plotly.express as px
+
+        px.choropleth(
+            locations=["AL"], locationmode="USA-states", color=[0.0], scope="usa"
+        ).to_dict()
+
+    stage("imports", imports)
+    for geography in [i.strip() for i in GEOGRAPHIES.split(",") if i.strip()]:
+        stage(f"{geography} data", lambda: data(geography))
+    stage("map template", template)
+
+    import profiling
+
+    seconds = time.perf_counter() - begin
+    profiling.record("warmup", seconds)
+    status.update(ready=True, stage="done", seconds=seconds)
+    try:
+        os.makedirs(os.path.dirname(READY), exist_ok=True)
+        temporary = f"{READY}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(status | {"pid": os.getpid(), "time": time.time()}, f)
+        os.replace(temporary, READY)
+    except OSError:
+        traceback.print_exc()
+    ready.set()
+    print(
+        f"Warm-up finished in {seconds:.1f} s"
+        + (f" with {len(status['errors'])} errors" if status["errors"] else ""),
+        flush=True,
+    )
+
+
+def wait(timeout: float = None):
+    """
+    Waits until the warm-up is done, starting it if it has not been started
+
+    Args:
+        timeout (float): The most seconds to wait, forever if left out
+    Returns:
+        bool: Whether the warm-up is done
+    """
+    start()
+    return ready.wait(timeout)
+
+
+def describe():
+    """
+    Describes how far the warm-up of this process has come
+
+    Returns:
+        str: One line for the diagnostics
+    """
+    if not status["ready"]:
+        return f"Warm-up is running: {status['stage']}"
+    errors = status["errors"]
+    return f"Warm-up finished in {status['seconds']:.1f} s" + (
+        f" with errors: {'; '.join(errors)}" if errors else ""
+    )